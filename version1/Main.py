@@ -1,4 +1,7 @@
 import sys, os
+import re
+import multiprocessing
+import threading
 from PySide6.QtCore import QCoreApplication
 import matplotlib.pyplot as plt
 import numpy as np
@@ -10,37 +13,71 @@ from PySide6.QtWidgets import QFileDialog, QProgressDialog
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QTableWidgetItem, QInputDialog, QSplitter, QTextEdit, QPushButton, QVBoxLayout, QPlainTextEdit, QWidget, QLabel, QCompleter, QDialogButtonBox, QMenu, QFormLayout, QLineEdit, QMessageBox, QDialog
 from PySide6.QtGui import QAction, QTextCursor, QTransform, QPixmap
-from PySide6.QtCore import Qt, QThread, Signal, QStringListModel, QSortFilterProxyModel, QRect
+from PySide6.QtCore import Qt, QThread, Signal, QStringListModel, QSortFilterProxyModel, QRect, QTimer
 from datetime import datetime
 import pandas as pd
 import MyDs  # Custom data structure module (likely a utility module for data management)
 from ui_form import Ui_Widget  # Auto-generated UI class from Qt Designer for the main window
 from ui_scriptdialog import Ui_Dialog  # Auto-generated UI class from Qt Designer for the script dialog
 
+# Filter fields holding only "key=value, key=value" pairs become __att filters, anything else a where clause
+ATTRIBUTE_LIST = re.compile(r"\s*\w+\s*=\s*\w+\s*(?:,\s*\w+\s*=\s*\w+\s*)*")
+
 # This class handles rotating images in a separate thread to allow for smooth animation
 from PySide6.QtCore import QThread, Signal
 
 class WorkerThread(QThread):
+    """
+    WorkerThread loads a log file with MyDs.initialize in the background, forwarding
+    the parse progress as a percentage. cancel() stops the load; the previously
+    loaded dataset is then kept.
+
+    Attributes:
+    -----------
+    file_name : str
+        The log file being loaded.
+    keep_types, keep_attributes : set or None
+        The projection passed to MyDs.initialize (None loads everything).
+    loaded : bool
+        Whether the file replaced the loaded dataset (set when the thread finishes).
+    cancelled : bool
+        Whether the load was cancelled (set when the thread finishes).
+    """
     progress = Signal(int)  # Signal to send progress updates
     finished = Signal()  # Signal to indicate task completion
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, keep_types=None, keep_attributes=None):
         super().__init__()
         self.file_name = file_name
+        self.keep_types = keep_types
+        self.keep_attributes = keep_attributes
+        self.loaded = False
+        self.cancelled = False
+        self.cancel_event = threading.Event()  # Cancel token checked by the parser
 
     def run(self):
         """
         This is the code that runs in the background thread.
         """
-        # Simulate long-running initialization (replace with MyDs.initialize)
-        MyDs.initialize(self.file_name)
+        try:
+            self.loaded = MyDs.initialize(self.file_name, keep_types=self.keep_types, keep_attributes=self.keep_attributes,
+                                          progress=self.report, cancel=self.cancel_event)
+        except MyDs.ParseCancelled:
+            self.cancelled = True
+        self.finished.emit()  # Emit a signal when done
 
-        # Emit progress periodically if applicable (this is just a simulation)
-        for i in range(1, 101):
-            self.msleep(100)  # Simulate work
-            self.progress.emit(i)  # Emit progress signal
+    def report(self, done, total):
+        """
+        Progress callback of MyDs.initialize, called from this thread.
+        """
+        if total:
+            self.progress.emit(min(100, done * 100 // total))  # Emit progress signal
 
-        self.finished.emit()  # Emit a signal when done
+    def cancel(self):
+        """
+        Asks the running load to stop at its next progress check.
+        """
+        self.cancel_event.set()
 
 class RotateThread(QThread):
     """
@@ -145,7 +182,7 @@ class PromptWindow(QWidget):
 
         # Type input with auto-completion
         self.TypesBox = QLineEdit(self)
-        self.Typecompleter = SubstringCompleter(list(MyDs.dataset.lookup.keys()), self)  # Auto-complete based on dataset keys
+        self.Typecompleter = SubstringCompleter(list(MyDs.dataset.types), self)  # Auto-complete based on every type in the log, loaded or not
         self.TypesBox.setCompleter(self.Typecompleter)
         self.TypesBox.returnPressed.connect(self.selectType)  # Connect to method for filling X and Y axis suggestions
         layout.addRow("Type", self.TypesBox)
@@ -218,6 +255,15 @@ class PromptWindow(QWidget):
         When the user selects a type, the corresponding attributes are fetched from the dataset and added as suggestions.
         """
         self.type = self.TypesBox.text()  # Get the selected type from the input box
+        # Load the type and all its attributes in the background if the workspace projection skipped them
+        main_window.with_data([([self.type], None)], self.set_type_completers)
+
+    def set_type_completers(self):
+        """
+        Fills the X and Y axis completers with the attributes of the selected type.
+        """
+        if self.type not in MyDs.dataset.lookup:
+            return
         # Set up auto-completion for the X and Y axes based on attributes of the selected type
         self.TypeXcompleter = SubstringCompleter(list(MyDs.dataset.lookup[self.type][0][1].attributes.keys()), self)
         self.XBox.setCompleter(self.TypeXcompleter)
@@ -239,16 +285,19 @@ class PromptWindow(QWidget):
         filter_condition = self.filter_input.text() if self.filter_input.isVisible() else None
         script =self.script_view.toPlainText() if self.filter_input.isVisible() else None
         having_attribute = []
+        where = ""
 
-        # Parse the filter condition into key-value pairs if it's not empty
+        # Parse the filter condition into key-value pairs if it's not empty, anything else is a filter expression
         try:
-            if filter_condition:
+            if filter_condition and ATTRIBUTE_LIST.fullmatch(filter_condition):
                 having_attribute = [(i.split("=")[0], i.split("=")[1]) for i in filter_condition.replace(" ", "").split(",")]
+            elif filter_condition:
+                where = filter_condition
         except:
             pass
 
         # Call the plot_data function in the main window to handle the plot request
-        main_window.plot_data(log_type, start_time, end_time, x_axis, y_axis, having_attribute,script=script)
+        main_window.plot_data(log_type, start_time, end_time, x_axis, y_axis, having_attribute,script=script,where=where)
         self.close()  # Close the prompt window after plotting
 
     def on_cancel_clicked(self):
@@ -307,7 +356,7 @@ class SubstringCompleter(QCompleter):
 class FileReaderThread(QThread):
     """
     FileReaderThread reads large log files in chunks to avoid blocking the main thread.
-    It processes lines of the file and applies any selected filters, sending updates to the UI in real-time.
+    Compressed logs are decompressed while they are read (see MyDs.open_log). It processes lines of the file and applies any selected filters, sending updates to the UI in real-time.
 
     Attributes:
     -----------
@@ -325,6 +374,12 @@ class FileReaderThread(QThread):
         The current page of the log being processed and displayed.
     encountered_types : set
         A set of log types encountered during file reading.
+    start_offset : int
+        The byte offset at which reading starts (0 for the whole file).
+    offset : int
+        The byte offset just past the last processed line.
+    stop_event : threading.Event
+        Stop token checked between chunks (see stop).
 
     Signals:
     --------
@@ -339,7 +394,7 @@ class FileReaderThread(QThread):
     update_page = Signal()  # Signal to notify when a new page of content is ready
     update_types = Signal(set)  # Signal to send any new log types found during file reading
 
-    def __init__(self, file_name, chunk_size, lines_per_page, selected_filters, filtersflag, current_page):
+    def __init__(self, file_name, chunk_size, lines_per_page, selected_filters, filtersflag, current_page, start_offset=0):
         """
         Initializes the FileReaderThread with parameters for reading the file in chunks
         and applying filters to the data.
@@ -358,6 +413,8 @@ class FileReaderThread(QThread):
             Whether filters are currently being applied to the data.
         current_page : int
             The current page of data being displayed in the UI.
+        start_offset : int (optional)
+            Byte offset of the first line to read, used to read only appended lines.
         """
         super().__init__()
         self.file_name = file_name
@@ -367,6 +424,9 @@ class FileReaderThread(QThread):
         self.filtersflag = filtersflag
         self.current_page = current_page
         self.encountered_types = set()  # Initialize an empty set for log types
+        self.start_offset = start_offset
+        self.offset = start_offset
+        self.stop_event = threading.Event()  # Stop token checked by the read loop
 
     def run(self):
         """
@@ -374,25 +434,39 @@ class FileReaderThread(QThread):
         filters if necessary, updating the UI in real-time.
         """
         try:
-            with open(self.file_name, 'r') as file:
-                buffer = ""  # Initialize an empty buffer to store file content
-                while True:
+            with MyDs.open_log(self.file_name) as file:  # Decompresses .gz/.xz/.zst logs on the fly
+                file.seek(self.start_offset)  # Skip the lines that were already read
+                buffer = b""  # Initialize an empty buffer to store file content
+                while not self.stop_event.is_set():
                     chunk = file.read(self.chunk_size)  # Read a chunk of the file
                     if not chunk:
                         break  # If no more content, exit the loop
                     buffer += chunk
-                    if '\n' in buffer:
-                        lines = buffer.split('\n')  # Split buffer into lines
+                    if b'\n' in buffer:
+                        lines = buffer.split(b'\n')  # Split buffer into lines
                         for line in lines[:-1]:  # Process each line except the last (which may be incomplete)
-                            self.process_line(line)
+                            self.process_line(line.rstrip(b'\r').decode('utf-8', 'replace'))
+                        self.offset += len(buffer) - len(lines[-1])
                         buffer = lines[-1]  # Keep the last incomplete line in the buffer for the next chunk
-                if buffer:
-                    self.process_line(buffer)  # Process the remaining content in the buffer
+                if self.stop_event.is_set():
+                    return  # Stopped, the caller replaces whatever was read
+                # A last line without a newline may still be written and is left for the next
+                # read, like MyDs does; compressed logs are archives and are read to the end
+                if buffer and MyDs.detect_compression(self.file_name) is not None:
+                    self.process_line(buffer.rstrip(b'\r').decode('utf-8', 'replace'))  # Process the remaining content in the buffer
+                    self.offset += len(buffer)
             self.update_page.emit()  # Emit signal to update the page in the UI
             self.update_types.emit(self.encountered_types)  # Emit any newly encountered log types
         except Exception as e:
             print(e)
 
+    def stop(self):
+        """
+        Asks the running read to stop before its next chunk; wait() then returns
+        once it has.
+        """
+        self.stop_event.set()
+
     def process_line(self, line):
         """
         Process each line of the log and apply any filters.
@@ -419,7 +493,8 @@ class FileReaderThread(QThread):
     def extract_type(self, line):
         """
         Extracts the log type from the line of text.
-        Assumes the log type is within parentheses in the second tab-delimited section of the line.
+        Assumes the log type is within parentheses in the second tab-delimited section of the line;
+        lines of other log formats are split by the scan function of the loaded format.
 
         Parameters:
         -----------
@@ -431,6 +506,11 @@ class FileReaderThread(QThread):
         str or None
             Returns the extracted log type, or None if no type could be found.
         """
+        if MyDs.dataset.log_format != MyDs.DEFAULT_FORMAT:
+            data = line.encode('utf-8')
+            for _, _, log_type, _ in MyDs.dataset.scan(data, 0, len(data)):
+                return log_type
+            return None
         try:
             id_index = line.split('\t')[1].index('(')  # Find the opening parenthesis in the second section of the line
             log_type = line.split('\t')[1][:id_index]  # Extract the type from before the parenthesis
@@ -692,6 +772,8 @@ class MainWindow(QMainWindow):
         A thread to handle rotating the image.
     hidden : str
         A flag to determine if the rotating image is hidden or visible.
+    follow_timer : QTimer
+        A timer that polls the log file for appended lines while following it.
     """
 
     def __init__(self, parent=None):
@@ -723,6 +805,9 @@ class MainWindow(QMainWindow):
         self.lines_per_page = 1000  # Number of lines displayed per page
         self.current_page = 0  # Current page of log content being displayed
         self.file_reader_thread = None  # Thread for reading the log file
+        self.worker_thread = None  # Thread parsing a log file into MyDs.dataset
+        self.load_dialog = None  # Progress dialog of the running load
+        self.on_loaded = None  # Called instead of showing the file once the running load has finished
         self.graphs = []  # List to store graph data
         self.graphs_model = QStringListModel()  # Model to display the list of graphs in the UI
         self.ui.GraphsListView.setModel(self.graphs_model)  # Set the model for the graphs list view
@@ -757,6 +842,11 @@ class MainWindow(QMainWindow):
 
         # Script window functionality
         self.ui.ScriptButton.clicked.connect(self.open_script_window)  # Open script editor window
+
+        # Follow mode: poll the log file for appended lines
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setInterval(1000)  # Poll once per second
+        self.follow_timer.timeout.connect(self.poll_log)
     # Function to display context menu for table column headers
     def show_column_context_menu(self, position):
         """
@@ -859,10 +949,6 @@ class MainWindow(QMainWindow):
         if dialog.exec() == QDialog.Accepted:  # If the user accepts the dialog
             col_name, filter_value, log_type, start_time, end_time, x_axis = dialog.get_data()
             if col_name:  # Only proceed if a column name is provided
-                col_index = self.ui.tableWidget.columnCount()  # Get the current column count
-                self.ui.tableWidget.insertColumn(col_index)  # Add a new column
-                self.ui.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(col_name))  # Set the column header
-
                 # Handle empty inputs with defaults
                 if not log_type:
                     return
@@ -875,22 +961,54 @@ class MainWindow(QMainWindow):
 
                 # Parse the filter values if provided
                 having_attribute = []
+                where = ""
                 try:
-                    if filter_value:
+                    if filter_value and ATTRIBUTE_LIST.fullmatch(filter_value):
                         having_attribute = [(i.split("=")[0], i.split("=")[1]) for i in filter_value.replace(" ", "").split(",")]
+                    elif filter_value:
+                        where = f" where {filter_value}"  # A filter expression, see MyDs.parse_filter
                 except:
                     pass
 
-                # Construct the command to get data and populate the column
-                command = f"Plot {log_type} x=default y={x_axis} from={start_time} to={end_time} " + ' '.join(f"__att[{key}]={value}" for key, value in having_attribute)
-                Xdata = MyDs.get(command)  # Fetch the data using the constructed command
+                # Construct one command per attribute ("Lfn, Slot" adds two columns) and populate the columns
+                filters = ' '.join(f"__att[{key}]={value}" for key, value in having_attribute) + where
+                attributes = [attribute.strip() for attribute in x_axis.split(",") if attribute.strip()]
+                names = [col_name] if len(attributes) == 1 else [f"{col_name}.{attribute}" for attribute in attributes]
+                commands = [f"Plot {log_type} x=default y={attribute} from={start_time} to={end_time} {filters}" for attribute in attributes]
+                self.add_columns(names, commands)
+
+    # Function to add data columns to the table widget
+    def add_columns(self, names, commands):
+        """
+        Adds one column per command to the table widget. The data of all columns
+        is fetched with a single MyDs.get_many call, which shares the filtering
+        between columns that select the same entries.
+
+        Parameters:
+        -----------
+        names : list
+            The column headers.
+        commands : list
+            The Plot commands returning the data of the columns.
+        """
+        self.with_data(self.command_needs(commands), lambda: self.fill_columns(names, commands))
+
+    # Function to fill new table columns with the data of their commands
+    def fill_columns(self, names, commands):
+        """
+        Adds the columns of add_columns once the dataset holds their data.
+        """
+        for name, data in zip(names, MyDs.get_many(commands)):
+            col_index = self.ui.tableWidget.columnCount()  # Get the current column count
+            self.ui.tableWidget.insertColumn(col_index)  # Add a new column
+            self.ui.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(name))  # Set the column header
 
-                # Populate the new column with data
-                row_count = self.ui.tableWidget.rowCount()
-                for row, value in enumerate(Xdata):
-                    if row >= row_count:
-                        self.ui.tableWidget.insertRow(row)  # Add a new row if necessary
-                    self.ui.tableWidget.setItem(row, col_index, QTableWidgetItem(str(value)))  # Set the cell value
+            # Populate the new column with data
+            row_count = self.ui.tableWidget.rowCount()
+            for row, value in enumerate(data or []):
+                if row >= row_count:
+                    self.ui.tableWidget.insertRow(row)  # Add a new row if necessary
+                self.ui.tableWidget.setItem(row, col_index, QTableWidgetItem(str(value)))  # Set the cell value
 
     # Function to update the rotating image in the UI
     def update_image(self, pixmap):
@@ -940,7 +1058,7 @@ class MainWindow(QMainWindow):
                 file.write(f"{self.file_name}\n")  # Save the log file name
                 file.write(','.join(self.selected_filters) + '\n')  # Save the selected filters
                 for graph in self.graphs:
-                    file.write(f"{graph['timestamp']}|{graph['log_type']}|{graph['start_time']}|{graph['end_time']}|{graph['x_axis']}|{graph['y_axis']}\n")  # Save the graph details
+                    file.write(f"{graph['timestamp']}|{graph['log_type']}|{graph['start_time']}|{graph['end_time']}|{graph['x_axis']}|{graph['y_axis']}|{graph['attr_command'].strip()}\n")  # Save the graph details and filters
 
     # Function to open the plot prompt window
     def open_prompt_window(self):
@@ -954,46 +1072,135 @@ class MainWindow(QMainWindow):
     # Function to load available filters from a file
     def load_file(self):
         options = QFileDialog.Options()
-        self.file_name, _ = QFileDialog.getOpenFileName(self,"Open File","","All Files (*);;Text Files (*.txt);;SAV Files (*.sav)",options=options)
-        if self.file_name:
-            if self.file_name.endswith('.sav'):
-                self.load_sav_file(self.file_name)
+        file_name, _ = QFileDialog.getOpenFileName(self,"Open File","","All Files (*);;Text Files (*.txt);;SAV Files (*.sav)",options=options)
+        if file_name:
+            if file_name.endswith('.sav'):
+                self.load_sav_file(file_name)
             else:
-                MyDs.initialize(self.file_name)
-                self.content = []
-                self.current_page = 0
-                self.show_output()
+                self.load_log(file_name)
+
+    # Function to parse a log file in the background with a cancellable progress dialog
+    def load_log(self, file_name, keep_types=None, keep_attributes=None, on_loaded=None):
+        """
+        Loads a log file in a WorkerThread while a progress dialog shows how much of
+        it has been parsed. Cancelling keeps the file that was loaded before.
+
+        Parameters:
+        -----------
+        file_name : str
+            The log file to load.
+        keep_types, keep_attributes : set (optional)
+            Only load these message types and attributes (see MyDs.initialize).
+        on_loaded : callable (optional)
+            Called once the file is loaded, instead of showing it in the text area.
+        """
+        if self.worker_thread and self.worker_thread.isRunning():
+            return  # One load at a time
+        self.on_loaded = on_loaded
+        self.load_dialog = QProgressDialog(f"Loading {os.path.basename(file_name)}...", "Cancel", 0, 100, self)
+        self.load_dialog.setWindowModality(Qt.WindowModal)
+        self.load_dialog.setMinimumDuration(500)  # Only show up for loads that take a while
+        self.worker_thread = WorkerThread(file_name, keep_types, keep_attributes)
+        self.worker_thread.progress.connect(self.load_dialog.setValue)
+        self.worker_thread.finished.connect(self.log_loaded)
+        self.load_dialog.canceled.connect(self.worker_thread.cancel)
+        self.worker_thread.start()
+
+    # Function to show a log file once its WorkerThread has finished
+    def log_loaded(self):
+        """
+        Closes the progress dialog and, unless the load failed or was cancelled,
+        shows the newly loaded file (or calls the on_loaded callback of load_log).
+        """
+        self.load_dialog.canceled.disconnect(self.worker_thread.cancel)
+        self.load_dialog.close()
+        on_loaded, self.on_loaded = self.on_loaded, None
+        if not self.worker_thread.loaded:
+            return
+        self.file_name = self.worker_thread.file_name
+        if on_loaded:
+            on_loaded()
+            return
+        self.content = []
+        self.current_page = 0
+        self.show_output()
 
     def load_sav_file(self, file_path):
         self.graphs.clear()  # Clear existing graphs
         with open(file_path, 'r') as file:
-            self.file_name = file.readline().strip()
-            print(f"Loaded file path: {self.file_name}")  # Debug output
-            MyDs.initialize(self.file_name)
-            
+            log_file = file.readline().strip()
+            print(f"Loaded file path: {log_file}")  # Debug output
+
             selected_filters = file.readline().strip()
             self.selected_filters = selected_filters.split(',')
             print(f"Loaded filters: {self.selected_filters}")  # Debug output
-            
+
             # Set the filters text in the UI
             self.ui.FilterInput.setPlainText(','.join(self.selected_filters))
 
             for line in file:
-                timestamp, log_type, start_time, end_time, x_axis, y_axis = line.strip().split('|')
+                fields = line.strip().split('|')
+                timestamp, log_type, start_time, end_time, x_axis, y_axis = fields[:6]
                 graph_info = {
                     'timestamp': timestamp,
                     'log_type': log_type,
                     'x_axis': x_axis,
                     'y_axis': y_axis,
                     'start_time': start_time,
-                    'end_time': end_time
+                    'end_time': end_time,
+                    'attr_command': fields[6] if len(fields) > 6 else ''  # Files saved without filters have six fields
                 }
                 print(f"Loading graph: {graph_info}")  # Debug output
                 self.graphs.append(graph_info)
-            self.update_graphs_list()  # Update the UI with loaded graphs
-        
-        # Apply the loaded filters to the view
-        self.apply_loaded_filters()
+
+        # Only load the message types and attributes the saved graphs use, filters included
+        keep_types = set()
+        keep_attributes = set()
+        for graph in self.graphs:
+            query = MyDs.Query.compile(self.graph_command(graph))
+            if query is None:
+                keep_types = keep_attributes = None  # Cannot tell what the graph reads, load everything
+                break
+            if keep_types is not None:
+                if query.types == 'all':
+                    keep_types = None
+                else:
+                    keep_types.update(query.types)
+            keep_attributes.update(key for key in query.keys() if key)
+        if not self.graphs:
+            keep_types = keep_attributes = None
+        self.update_graphs_list()  # Update the UI with loaded graphs
+
+        # Parse the log in the background, then apply the loaded filters to the view
+        self.load_log(log_file, keep_types, keep_attributes, on_loaded=self.apply_loaded_filters)
+
+    # Function to run an action once the dataset holds the data it needs
+    def with_data(self, needs, action):
+        """
+        Runs an action that reads the dataset. If the workspace projection left
+        out message types or attributes it needs, the whole log is first loaded
+        again in a WorkerThread (as by load_log), so MyDs.require never parses
+        it on the GUI thread.
+
+        Parameters:
+        -----------
+        needs : list
+            (types, keys) pairs the action reads, as for MyDs.require.
+        action : callable
+            The action to run.
+        """
+        if not self.file_name or all(MyDs.dataset.covers(types, keys) for types, keys in needs):
+            action()
+        else:
+            self.load_log(self.file_name, on_loaded=action)
+
+    # Function to list the data plot commands read
+    def command_needs(self, commands):
+        """
+        Returns the (types, keys) pairs the valid commands read, for with_data.
+        """
+        queries = [MyDs.Query.compile(command) for command in commands]
+        return [(query.types, query.keys()) for query in queries if query is not None]
     def apply_loaded_filters(self):
         if self.selected_filters:
             self.filtersflag = True  # Set the flag to use filters
@@ -1143,54 +1350,6 @@ class MainWindow(QMainWindow):
         script_window = ScriptWindow(self, self.ui.tableWidget)  # Create a new ScriptWindow
         script_window.exec()  # Show the script window
 
-    # # Function to load a saved graph and filter context from a file
-    # def load_sav_file(self, file_path):
-    #     """
-    #     Loads a saved file containing graphs and filters.
-    #     Restores the saved graphs and filter settings in the UI.
-
-    #     Parameters:
-    #     -----------
-    #     file_path : str
-    #         The path to the saved file (.sav).
-    #     """
-    #     self.graphs.clear()  # Clear the current graph list
-    #     with open(file_path, 'r') as file:
-    #         self.file_name = file.readline().strip()  # Read the first line as the log file name
-    #         MyDs.initialize(self.file_name)  # Initialize the dataset with the log file
-
-    #         selected_filters = file.readline().strip()  # Read the second line as the selected filters
-    #         self.selected_filters = selected_filters.split(',')  # Split the filters into a list
-
-    #         for line in file:
-    #             # Read and parse each line to restore graph data
-    #             timestamp, log_type, start_time, end_time, x_axis, y_axis = line.strip().split('|')
-    #             self.graphs.append({
-    #                 'timestamp': timestamp,
-    #                 'log_type': log_type,
-    #                 'x_axis': x_axis,
-    #                 'y_axis': y_axis,
-    #                 'start_time': start_time,
-    #                 'end_time': end_time
-    #             })
-
-    #         self.update_graphs_list()  # Update the list of graphs in the UI
-
-    #     self.apply_loaded_filters()  # Apply the loaded filters
-
-    # # Function to apply loaded filters to the data
-    # def apply_loaded_filters(self):
-    #     """
-    #     Applies the loaded filters to the current log data and refreshes the view.
-    #     """
-    #     if self.selected_filters:
-    #         self.filtersflag = True  # Set the filter flag
-    #         self.content = []  # Reset content buffer
-    #         self.current_page = 0  # Reset the current page
-    #         self.show_output()  # Show the filtered content
-    #     else:
-    #         self.remove_all_filters()  # Remove filters if none are loaded
-
     # # Function to handle filter selection in the UI
     # def on_filter_selected(self):
     #     """
@@ -1205,6 +1364,16 @@ class MainWindow(QMainWindow):
 
     #     self.add_filter()  # Apply the new filter
 
+    # Function to stop the running file reader thread
+    def stop_file_reader(self):
+        """
+        Stops the running FileReaderThread, if any, and waits until it has
+        finished, so a new read never overlaps it.
+        """
+        if self.file_reader_thread and self.file_reader_thread.isRunning():
+            self.file_reader_thread.stop()
+            self.file_reader_thread.wait()
+
     # Function to show log output in the text area
     def show_output(self):
         """
@@ -1212,8 +1381,7 @@ class MainWindow(QMainWindow):
         Content is read in chunks to avoid performance issues with large files.
         """
         self.toggle_visibility()  # Hide the rotating image during file reading
-        if self.file_reader_thread and self.file_reader_thread.isRunning():
-            self.file_reader_thread.terminate()  # Stop the file reader thread if it's running
+        self.stop_file_reader()  # Stop the file reader thread if it's running
 
         # Create a new FileReaderThread to read the file in chunks
         self.file_reader_thread = FileReaderThread(
@@ -1230,6 +1398,85 @@ class MainWindow(QMainWindow):
         self.file_reader_thread.start()  # Start the thread for reading the file
         self.toggle_visibility()  # Show the rotating image again
 
+    # Function to start or stop following the log file
+    def toggle_follow(self, checked):
+        """
+        Starts or stops following the log file. While following, lines appended to
+        the file are parsed into the dataset, open plots are redrawn and the text
+        area shows the newest lines.
+
+        Parameters:
+        -----------
+        checked : bool
+            Whether follow mode is switched on.
+        """
+        if checked:
+            self.follow_timer.start()
+        else:
+            self.follow_timer.stop()
+
+    # Function to read the lines appended to the log file since the last poll
+    def poll_log(self):
+        """
+        Called by the follow timer. Parses the appended lines with MyDs.update and
+        reads them into the text area in the background, starting where the
+        previous FileReaderThread stopped.
+        """
+        if not self.file_name or (self.file_reader_thread and self.file_reader_thread.isRunning()):
+            return  # Nothing loaded yet, or the previous read has not finished
+        if MyDs.detect_compression(self.file_name):
+            return  # Compressed logs are archives, they do not grow
+        offset = self.file_reader_thread.offset if self.file_reader_thread else 0
+        try:
+            size = os.path.getsize(self.file_name)
+        except OSError:
+            return
+        if size == offset:
+            return  # Nothing appended
+        MyDs.update(self.file_name)  # Parse the new entries and redraw open plots
+        if size < offset:
+            # The file was truncated or replaced: read it again from the start
+            self.content = []
+            self.current_page = 0
+            self.show_output()
+            return
+
+        self.file_reader_thread = FileReaderThread(
+            self.file_name,
+            self.chunk_size,
+            self.lines_per_page,
+            self.selected_filters,
+            self.filtersflag,
+            self.current_page,
+            start_offset=offset
+        )
+        self.file_reader_thread.update_content.connect(self.append_content)  # Keep every new line
+        self.file_reader_thread.update_page.connect(self.display_tail)  # Show the newest lines
+        self.file_reader_thread.update_types.connect(self.update_filters)
+        self.file_reader_thread.start()
+
+    # Function to add an appended line to the content buffer
+    def append_content(self, line):
+        """
+        Adds a line appended to the followed log file to the content buffer.
+
+        Parameters:
+        -----------
+        line : str
+            The line of log data to add to the content buffer.
+        """
+        self.content.append(line)
+
+    # Function to show the newest lines of a followed log file
+    def display_tail(self):
+        """
+        Keeps the last page of content and displays it, scrolled to the end.
+        """
+        self.content = self.content[-self.lines_per_page:]
+        self.current_page = 0
+        self.display_page()
+        self.ui.TextArea.moveCursor(QTextCursor.End)
+
     # Function to update the content in the text area
     def update_content(self, line):
         """
@@ -1325,10 +1572,41 @@ class MainWindow(QMainWindow):
         Add2_col_action.triggered.connect(self.add_to_selected_text)  # Connect to add till here to table function
         context_menu.addAction(Add2_col_action)
 
+        context_menu.addSeparator()
+        goto_action = QAction("Go to Line...", self)
+        goto_action.triggered.connect(self.go_to_line)  # Connect to jump to a line of the log
+        context_menu.addAction(goto_action)
+
+        follow_action = QAction("Follow File", self)
+        follow_action.setCheckable(True)
+        follow_action.setChecked(self.follow_timer.isActive())
+        follow_action.triggered.connect(self.toggle_follow)  # Connect to start/stop following the log file
+        context_menu.addAction(follow_action)
+
         if not self.ui.TextArea.textCursor().selectedText():
             plot_action.setEnabled(False)  # Disable plot action if no text is selected
         context_menu.exec_(self.ui.TextArea.mapToGlobal(position))  # Show the context menu at the cursor's position
 
+    # Function to show the log from a given line on
+    def go_to_line(self):
+        """
+        Asks for a line number and shows the page of the log starting at that line.
+        The lines are read from their offsets in the line index of the dataset
+        (MyDs.dataset.read_lines), so the file is not read up to the line.
+        """
+        sources = MyDs.dataset.sources
+        if not self.file_name or not sources or sources[0][0] != self.file_name:
+            QMessageBox.information(self, "Go to Line", "Load a log file first.")
+            return
+        line_count = sources[1][2] if len(sources) > 1 else len(MyDs.dataset.line_offsets) - 1
+        line_number, ok = QInputDialog.getInt(self, "Go to Line", "Line number:", 1, 1, max(1, line_count))
+        if not ok:
+            return
+        self.stop_file_reader()  # The page replaces whatever was being read
+        self.content = MyDs.dataset.read_lines(line_number, self.lines_per_page)
+        self.current_page = 0
+        self.display_page()
+
     # Function to plot the selected text in the text area
     def plot_selected_text(self):
         """
@@ -1367,20 +1645,8 @@ class MainWindow(QMainWindow):
         time = entire_line_text.split(" ")[5]
         typ = c[:c.index("(")]
 
-        # Insert a new column into the table
-        col_index = self.ui.tableWidget.columnCount()
-        self.ui.tableWidget.insertColumn(col_index)
-        self.ui.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(selected_text))
-
-        # Fetch the data for the new column
-        xdata = MyDs.get(f"Plot {typ} x=default y={selected_text} from={MyDs.dataset.MIN} to={MyDs.dataset.MAX}")
-
-        # Populate the new column with data
-        row_count = self.ui.tableWidget.rowCount()
-        for row, value in enumerate(xdata):
-            if row >= row_count:
-                self.ui.tableWidget.insertRow(row)
-            self.ui.tableWidget.setItem(row, col_index, QTableWidgetItem(str(value)))
+        # Insert a new column with the data into the table
+        self.add_columns([selected_text], [f"Plot {typ} x=default y={selected_text} from={MyDs.dataset.MIN} to={MyDs.dataset.MAX}"])
 
     # Function to add data up to the selected line as a column in the table widget
     def add_to_selected_text(self):
@@ -1398,20 +1664,8 @@ class MainWindow(QMainWindow):
         time = entire_line_text.split(" ")[5]
         typ = c[:c.index("(")]
 
-        # Insert a new column into the table
-        col_index = self.ui.tableWidget.columnCount()
-        self.ui.tableWidget.insertColumn(col_index)
-        self.ui.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(selected_text))
-
-        # Fetch the data for the new column
-        xdata = MyDs.get(f"Plot {typ} x=default y={selected_text} from={MyDs.dataset.MIN} to={time}")
-
-        # Populate the new column with data
-        row_count = self.ui.tableWidget.rowCount()
-        for row, value in enumerate(xdata):
-            if row >= row_count:
-                self.ui.tableWidget.insertRow(row)
-            self.ui.tableWidget.setItem(row, col_index, QTableWidgetItem(str(value)))
+        # Insert a new column with the data into the table
+        self.add_columns([selected_text], [f"Plot {typ} x=default y={selected_text} from={MyDs.dataset.MIN} to={time}"])
 
     # Function to add data from the selected line onwards as a column in the table widget
     def add_from_selected_text(self):
@@ -1429,20 +1683,8 @@ class MainWindow(QMainWindow):
         time = entire_line_text.split(" ")[5]
         typ = c[:c.index("(")]
 
-        # Insert a new column into the table
-        col_index = self.ui.tableWidget.columnCount()
-        self.ui.tableWidget.insertColumn(col_index)
-        self.ui.tableWidget.setHorizontalHeaderItem(col_index, QTableWidgetItem(selected_text))
-
-        # Fetch the data for the new column
-        xdata = MyDs.get(f"Plot {typ} x=default y={selected_text} from={time} to={MyDs.dataset.MAX}")
-
-        # Populate the new column with data
-        row_count = self.ui.tableWidget.rowCount()
-        for row, value in enumerate(xdata):
-            if row >= row_count:
-                self.ui.tableWidget.insertRow(row)
-            self.ui.tableWidget.setItem(row, col_index, QTableWidgetItem(str(value)))
+        # Insert a new column with the data into the table
+        self.add_columns([selected_text], [f"Plot {typ} x=default y={selected_text} from={time} to={MyDs.dataset.MAX}"])
 
     # Function to plot data up to the selected line in the text area
     def Plot_To(self):
@@ -1487,7 +1729,7 @@ class MainWindow(QMainWindow):
         self.plot_data(typ, time, MyDs.dataset.MAX, 'default', selected_text)  # Call the plot function
 
     # Function to plot the data using the specified parameters
-    def plot_data(self, log_type, start_time, end_time, x_axis, y_axis, having_attribute=[], parent_having_attribute=[],script=""):
+    def plot_data(self, log_type, start_time, end_time, x_axis, y_axis, having_attribute=[], parent_having_attribute=[],script="",where=""):
         """
         Plots the data using the specified parameters and updates the list of saved graphs.
 
@@ -1507,6 +1749,8 @@ class MainWindow(QMainWindow):
             A list of additional filter attributes for the data.
         parent_having_attribute : list
             A list of parent filter attributes for the data.
+        where : str
+            A filter expression such as "NumDecodes>0 and Slot in (0,1)" (see MyDs.parse_filter).
         """
         self.toggle_visibility()  # Hide the rotating image while plotting
         if not log_type:
@@ -1515,6 +1759,9 @@ class MainWindow(QMainWindow):
         if not y_axis:
             return  # Exit if no Y-axis is specified
 
+        # Without an explicit range the command covers the whole log, including lines appended while following it
+        open_range = not start_time and not end_time
+
         if not start_time:
             start_time = MyDs.dataset.MIN  # Set default start time
 
@@ -1527,9 +1774,12 @@ class MainWindow(QMainWindow):
         # Construct the plot command with optional filter attributes
         attr_command = ' '.join(f"__att[{key}]={value}" for key, value in having_attribute)
         parent_attr_command = ' '.join(f"p__att[{key}]={value}" for key, value in parent_having_attribute)
-        command = f"Plot {log_type} x={x_axis} y={y_axis} from={start_time} to={end_time} {attr_command} {parent_attr_command}"
+        if where:
+            parent_attr_command += f" where {where}"  # Saved with attr_command below so re-plots keep it
+        time_range = "" if open_range else f"from={start_time} to={end_time} "
+        command = f"Plot {log_type} x={x_axis} y={y_axis} {time_range}{attr_command} {parent_attr_command}"
 
-        MyDs.main(command,script)  # Call the main plotting function
+        self.with_data(self.command_needs([command]), lambda: MyDs.main(command, script))  # Call the main plotting function
 
         # Save the graph details for future reference
         graph_info = {
@@ -1539,7 +1789,7 @@ class MainWindow(QMainWindow):
             'y_axis': y_axis,
             'start_time': start_time,
             'end_time': end_time,
-            'attr_command': attr_command
+            'attr_command': f"{attr_command} {parent_attr_command}"
         }
         self.graphs.append(graph_info)  # Add the graph info to the list
         self.update_graphs_list()  # Update the graph list in the UI
@@ -1568,12 +1818,30 @@ class MainWindow(QMainWindow):
             The index of the selected graph in the list.
         """
         graph_info = self.graphs[index.row()]  # Get the selected graph info
-        command = f"Plot {graph_info['log_type']} x={graph_info['x_axis']} y={graph_info['y_axis']} from={graph_info['start_time']} to={graph_info['end_time']} {graph_info['attr_command']}"
-        MyDs.main(command)  # Re-plot the graph using the saved parameters
+        command = self.graph_command(graph_info)
+        self.with_data(self.command_needs([command]), lambda: MyDs.main(command))  # Re-plot the graph using the saved parameters
+
+    # Function to build the plot command of a saved graph
+    def graph_command(self, graph_info):
+        """
+        Returns the plot command that draws a saved graph again.
+
+        Parameters:
+        -----------
+        graph_info : dict
+            The saved graph (see plot_data).
+
+        Returns:
+        --------
+        str
+            The plot command.
+        """
+        return f"Plot {graph_info['log_type']} x={graph_info['x_axis']} y={graph_info['y_axis']} from={graph_info['start_time']} to={graph_info['end_time']} {graph_info['attr_command']}"
 
 
 # Entry point for the application
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed by the parser's process pool in the frozen executable
     app = QApplication(sys.argv)  # Create the QApplication object
     main_window = MainWindow()  # Create an instance of the MainWindow
     main_window.show()  # Show the main window
@@ -2,6 +2,28 @@ import matplotlib.pyplot as plt
 import numpy as np
 import mplcursors
 import re
+import os
+from collections import OrderedDict
+from collections.abc import MutableMapping
+import mmap
+import json
+import struct
+import hashlib
+import io
+import bisect
+import glob
+import heapq
+import operator
+import zlib
+import lzma
+import time
+import itertools
+import copy
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+try:
+    import zstandard  # Optional, only needed to read .zst logs
+except ImportError:
+    zstandard = None
 def runScript(x_data, y_data, script):
     # Define a local dictionary to store the variables
     local_vars = {'x_data': x_data, 'y_data': y_data}
@@ -12,6 +34,446 @@ def runScript(x_data, y_data, script):
     # Return the updated x_data and y_data
     return local_vars['x_data'], local_vars['y_data']
 
+# Scan tab-separated log records directly from a bytes-like buffer
+def _scan_records(buf, start, end):
+    """
+    Scans the log lines in buf[start:end] as raw bytes and yields the offset,
+    timestamp, message type and attribute string of every line that contains a tab. Only
+    those three fields are decoded; message type names are decoded once per
+    distinct type and shared. Works on bytes and on mmap objects alike.
+
+    Parameters:
+    -----------
+    buf : bytes or mmap.mmap
+        The buffer holding the log text.
+    start : int
+        Offset of the first line to scan (must be at the start of a line).
+    end : int
+        Offset at which scanning stops.
+
+    Yields:
+    -------
+    tuple
+        (position, timestamp, message_type, attributes_str): the offset of the
+        line in buf, then the fields as str.
+    """
+    find, rfind = buf.find, buf.rfind
+    names = {}  # Raw message type bytes -> decoded name
+    pos = start
+    while pos < end:
+        newline = find(b'\n', pos, end)
+        if newline < 0:
+            newline = end
+        tab = find(b'\t', pos, newline)
+        if tab >= 0:
+            pre_message_parts = buf[pos:tab].split(None, 1)
+            if pre_message_parts:
+                message_end = find(b'\t', tab + 1, newline)
+                if message_end < 0:
+                    message_end = newline
+                open_paren = find(b'(', tab + 1, message_end)
+                if open_paren < 0:
+                    raw_type, attributes_str = buf[tab + 1:message_end].strip(), ''
+                else:
+                    close_paren = rfind(b')', open_paren, message_end)
+                    raw_type = buf[tab + 1:open_paren].strip()
+                    attributes_str = buf[open_paren + 1:close_paren if close_paren > open_paren else message_end].decode('utf-8', 'replace')
+                message_type = names.get(raw_type)
+                if message_type is None:
+                    message_type = names[raw_type] = raw_type.decode('utf-8', 'replace')
+                yield pos, pre_message_parts[0][:-1].decode('ascii', 'replace'), message_type, attributes_str
+        pos = newline + 1
+
+# Scan whitespace-separated log records directly from a bytes-like buffer
+def _scan_fields(buf, start, end):
+    """
+    Scans log lines of the form 'timestamp module process message_type attributes'
+    (five whitespace-separated fields, the attributes being the rest of the line
+    as 'key: value' pairs separated by commas) in buf[start:end]. A colon after the
+    timestamp is dropped. Same interface as _scan_records.
+
+    Parameters:
+    -----------
+    buf : bytes or mmap.mmap
+        The buffer holding the log text.
+    start : int
+        Offset of the first line to scan (must be at the start of a line).
+    end : int
+        Offset at which scanning stops.
+
+    Yields:
+    -------
+    tuple
+        (position, timestamp, message_type, attributes_str).
+    """
+    find = buf.find
+    names = {}  # Raw message type bytes -> decoded name
+    pos = start
+    while pos < end:
+        newline = find(b'\n', pos, end)
+        if newline < 0:
+            newline = end
+        parts = buf[pos:newline].split(None, 4)
+        if len(parts) == 5:
+            raw_type = parts[3]
+            message_type = names.get(raw_type)
+            if message_type is None:
+                message_type = names[raw_type] = raw_type.decode('utf-8', 'replace')
+            yield pos, parts[0].rstrip(b':').decode('ascii', 'replace'), message_type, parts[4].decode('utf-8', 'replace')
+        pos = newline + 1
+
+# Log formats the parse engines understand: name -> (scan function, line pattern)
+LOG_FORMATS = {}
+DEFAULT_FORMAT = "tab"
+DETECT_BYTES = 16 * 1024  # Bytes of a log sampled by detect_format
+
+# Add a log format to the registry
+def register_format(name, scan, pattern):
+    """
+    Registers a log format. The scan function is all a format has to provide:
+    every parse engine (memory map, parallel chunks, compressed streams, follow
+    mode, several files) calls it on line-aligned byte ranges, and the entries
+    get the same typed columns, hierarchy, line index and index sidecar as the
+    default format.
+
+    Parameters:
+    -----------
+    name : str
+        The name of the format (MYDS.log_format, initialize's log_format).
+    scan : callable
+        scan(buf, start, end) yielding (position, timestamp, message_type,
+        attributes_str) for the lines in buf[start:end], like _scan_records.
+        attributes_str holds 'key: value' pairs separated by commas.
+    pattern : bytes
+        A regular expression matching a typical line of the format, used by
+        detect_format.
+    """
+    LOG_FORMATS[name] = (scan, re.compile(pattern))
+
+register_format("tab", _scan_records, rb'\s*\S+\s[^\t]*\t[^\t(]+\(')
+register_format("fields", _scan_fields, rb' *\S+ +\S+ +\S+ +\S+ +[^\s:,]+ *:[^\t]*$')
+
+# Guess the format of a log file from its first lines
+def detect_format(path):
+    """
+    Reads the first DETECT_BYTES of a (possibly compressed) log and returns the
+    registered format whose pattern matches most of its lines, DEFAULT_FORMAT if
+    none matches. Ties go to the format registered first.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+
+    Returns:
+    --------
+    str
+        The name of the format.
+    """
+    with open_log(path) as stream:
+        sample = stream.read(DETECT_BYTES)
+    lines = sample.split(b'\n')
+    if len(sample) == DETECT_BYTES and len(lines) > 1:
+        lines.pop()  # Incomplete last line
+    lines = [line.rstrip(b'\r') for line in lines if line.strip()]
+    best, best_count = DEFAULT_FORMAT, 0
+    for name, (_, pattern) in LOG_FORMATS.items():
+        count = sum(1 for line in lines if pattern.match(line))
+        if count > best_count:
+            best, best_count = name, count
+    return best
+
+# Read a binary stream in blocks of whole lines
+def _line_blocks(stream, block_size):
+    """
+    Reads a binary stream block by block and yields the blocks cut at their last
+    newline, carrying the incomplete line over to the next block. The last block
+    may end without a newline.
+
+    Parameters:
+    -----------
+    stream : binary file object
+        The stream to read.
+    block_size : int
+        The number of bytes read at a time.
+
+    Yields:
+    -------
+    bytes
+        Consecutive pieces of the stream that start at the beginning of a line.
+    """
+    tail = b''  # Incomplete last line of the previous block
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        block = tail + block
+        end = block.rfind(b'\n') + 1
+        tail = block[end:]
+        if end:
+            yield block[:end]
+    if tail:
+        yield tail
+
+# Hold back a last line that is still being written
+def _complete_lines(lines):
+    """
+    Yields the lines of an iterable, leaving out the last one if it does not end
+    with a newline (the line is still being written; MYDS.update reads it once
+    it is complete).
+    """
+    previous = None
+    for line in lines:
+        if previous is not None:
+            yield previous
+        previous = line
+    if previous is not None and previous.endswith('\n'):
+        yield previous
+
+LINE_SCAN_BYTES = 64 * 1024 * 1024  # Bytes searched for newlines at a time by _line_ends
+
+# Find where the lines of a buffer end
+def _line_ends(buf, start, end):
+    """
+    Returns the offset just past every line in buf[start:end] (past its newline,
+    or end for a last line without one), one per line visited by _scan_records.
+    The newlines are searched with NumPy, LINE_SCAN_BYTES at a time.
+
+    Parameters:
+    -----------
+    buf : bytes or mmap.mmap
+        The buffer holding the log text.
+    start : int
+        Offset of the first line (must be at the start of a line).
+    end : int
+        Offset at which the lines stop.
+
+    Returns:
+    --------
+    numpy.ndarray
+        The int64 end offsets, in buf coordinates.
+    """
+    parts = [np.empty(0, dtype=np.int64)]
+    for block_start in range(start, end, LINE_SCAN_BYTES):
+        count = min(LINE_SCAN_BYTES, end - block_start)
+        data = np.frombuffer(buf, dtype=np.uint8, count=count, offset=block_start)
+        parts.append(np.flatnonzero(data == 10).astype(np.int64) + (block_start + 1))
+    ends = np.concatenate(parts)
+    if end > start and (len(ends) == 0 or ends[-1] != end):
+        ends = np.append(ends, np.int64(end))
+    return ends
+
+# Split a file into byte ranges that start and end on line boundaries
+def _chunk_ranges(buf, count):
+    """
+    Splits buf into at most `count` contiguous byte ranges, each ending just after a newline.
+
+    Parameters:
+    -----------
+    buf : bytes or mmap.mmap
+        The buffer holding the log text.
+    count : int
+        The desired number of ranges.
+
+    Returns:
+    --------
+    list
+        A list of (start, end) offsets covering the whole buffer.
+    """
+    size = len(buf)
+    ranges, start = [], 0
+    for i in range(1, count):
+        newline = buf.find(b'\n', max(start, size * i // count))
+        if newline < 0:
+            break
+        ranges.append((start, newline + 1))
+        start = newline + 1
+    if start < size:
+        ranges.append((start, size))
+    return ranges
+
+# Split a byte range into line-aligned steps of about the same size
+def _line_ranges(buf, start, end, step):
+    """
+    Yields consecutive (start, end) ranges covering buf[start:end], each about
+    `step` bytes long and ending just after a newline (or at end).
+    """
+    while start < end:
+        newline = buf.find(b'\n', start + step, end)
+        stop = end if newline < 0 else newline + 1
+        yield start, stop
+        start = stop
+
+# Parse one byte range of a log file in a worker process
+def _parse_chunk(path, start, end, settings=None):
+    """
+    Parses the lines in bytes [start, end) of a log file. Runs in a worker process
+    of MYDS.parse_parallel. The chunk sees an empty parent stack, so parent links
+    are recorded relative to it and resolved later by MYDS._stitch_chunk.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+    start : int
+        Offset of the first byte of the chunk (start of a line).
+    end : int
+        Offset just past the last byte of the chunk.
+    settings : dict, optional
+        The MYDS.settings of the dataset (lazy parsing and projection).
+
+    Returns:
+    --------
+    tuple
+        (records, closed, still_open, skipped, line_ends) where records is a list of
+        (position, timestamp, message_type, attributes, parent). parent >= 0 is the index
+        of a record in this chunk; parent < 0 means the span that is on top of the
+        incoming parent stack after (-parent - 1) of its spans have been closed.
+        closed is the number of incoming spans closed by this chunk, still_open
+        the indices of chunk records whose spans are still open at its end and
+        skipped the number of entries per message type left out by the projection.
+        position is the file offset of the line of a record and line_ends are the
+        _line_ends of the chunk.
+    """
+    parser = MYDS(**(settings or {}))
+    scan = parser.scan
+    records, local_stack, closed = [], [], 0
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for position, timestamp, message_type, attributes_str in scan(buf, start, end):
+                skip = parser._skip(message_type)
+                parent = local_stack[-1] if local_stack else -(closed + 1)
+                if message_type.endswith("_START"):
+                    local_stack.append(len(records))
+                elif message_type.endswith("_END"):
+                    if local_stack:
+                        local_stack.pop()
+                    else:
+                        closed += 1  # Closes a span opened in an earlier chunk
+                if not skip:
+                    records.append((position, timestamp, message_type, attributes_str if parser.lazy else parser._parse_attributes(attributes_str, message_type), parent))
+            line_ends = _line_ends(buf, start, end)
+    return records, closed, local_stack, parser.skipped, line_ends
+
+# Parse a whole log file in a worker process
+def _parse_file(path, settings=None):
+    """
+    Parses one log file (plain or compressed) of a multi-file dataset. Runs in a
+    worker process of MYDS.parse_files. The hierarchy is not resolved here because
+    it depends on how the entries interleave with those of the other files.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+    settings : dict, optional
+        The MYDS.settings of the dataset (lazy parsing and projection).
+
+    Returns:
+    --------
+    tuple
+        (records, skipped, line_ends). records are (sort key, position, timestamp,
+        message_type, attributes) tuples in file order, position being the offset
+        of the line in the (decompressed) file. The sort key is the timestamp in seconds;
+        lines whose timestamp is not a number reuse the key of the line before them.
+        Entries left out by the projection are only counted per message type in
+        skipped. line_ends are the _line_ends of the whole file.
+    """
+    parser = MYDS(**(settings or {}))
+    scan = parser.scan
+    records, key, offset, line_ends = [], float('-inf'), 0, []
+    with open_log(path) as stream:
+        for block in _line_blocks(stream, 1024 * 1024):
+            for position, timestamp, message_type, attributes_str in scan(block, 0, len(block)):
+                try:
+                    key = float(timestamp)
+                except ValueError:
+                    pass
+                if parser._skip(message_type):
+                    continue
+                records.append((key, offset + position, timestamp, message_type, attributes_str if parser.lazy else parser._parse_attributes(attributes_str, message_type)))
+            line_ends.append(_line_ends(block, 0, len(block)) + offset)
+            offset += len(block)
+    return records, parser.skipped, np.concatenate(line_ends) if line_ends else np.empty(0, dtype=np.int64)
+
+# Move the records of one file of parse_files to dataset line offsets
+def _shifted(records, base):
+    for key, position, timestamp, message_type, attributes in records:
+        yield key, base + position, timestamp, message_type, attributes
+
+# Expand the path argument of initialize into a list of files
+def _expand_paths(paths):
+    """
+    Expands a file path, a glob pattern (e.g. 'trace.*') or a list of either into
+    the list of files they name. Paths that exist are kept as they are; patterns
+    are expanded in sorted order, skipping the index sidecars (and their temp
+    files) written next to the logs.
+
+    Parameters:
+    -----------
+    paths : str or list
+        The path(s) or pattern(s).
+
+    Returns:
+    --------
+    list
+        The file paths.
+    """
+    files = []
+    for path in ([paths] if isinstance(paths, (str, os.PathLike)) else paths):
+        if os.path.exists(path):
+            files.append(path)
+        else:
+            files.extend(match for match in sorted(glob.glob(path))
+                         if not match.endswith((INDEX_SUFFIX, INDEX_TEMP_SUFFIX)))
+    return files
+
+# Strip the 'parent_' prefixes of an attribute name
+def _base_attribute(key):
+    while key.startswith('parent_'):
+        key = key[len('parent_'):]
+    return key
+
+# NodeAttributes exposes a node's own attributes plus its parent's under 'parent_'
+class NodeAttributes(MutableMapping):
+    """
+    Mapping of a node's attributes. Only the node's own attributes are stored; a key
+    'parent_<name>' that is not stored on the node is resolved through node.parent
+    when it is read, so nested _START blocks share their attributes with every child
+    instead of copying them. Behaves like the dict MYNODE used to hold.
+    """
+    def __init__(self, node):
+        self._node = node
+        self._own = {}
+
+    def __getitem__(self, key):
+        if key in self._own:
+            return self._own[key]
+        parent = self._node.parent
+        if parent is not None and key.startswith('parent_'):
+            return parent.attributes[key[len('parent_'):]]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._own[key] = value
+
+    def __delitem__(self, key):
+        del self._own[key]
+
+    def __iter__(self):
+        parent = self._node.parent
+        if parent is not None:
+            for key in parent.attributes:
+                if 'parent_' + key not in self._own:
+                    yield 'parent_' + key
+        yield from self._own
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
 # MYNODE class represents a node in the log structure
 class MYNODE:
     """
@@ -22,34 +484,32 @@ class MYNODE:
     -----------
     name : str
         Name of the node (e.g., message type).
-    timestamp : str
-        The timestamp associated with the node.
+    timestamp : float
+        The timestamp associated with the node, in seconds.
     parent : MYNODE
         Reference to the parent node in the hierarchy (if any).
-    attributes : dict
-        A dictionary of attributes for the node, including inherited parent attributes.
+    attributes : NodeAttributes
+        A mapping of the node's attributes. Parent attributes are visible under a
+        'parent_' prefix and are looked up through the parent node on access.
     """
     def __init__(self, name="none", timestamp="", parent=None):
         """
         Initializes a new node with a name, timestamp, and optional parent.
-        Inherits attributes from the parent node.
+        Parent attributes are inherited by reference, not copied.
 
         Parameters:
         -----------
         name : str
             The name of the node (e.g., message type).
-        timestamp : str
-            The timestamp of the node.
+        timestamp : float
+            The timestamp of the node, in seconds.
         parent : MYNODE
             The parent node reference (if applicable).
         """
         self.name = name  # Name of the node
         self.timestamp = timestamp  # Timestamp of the node
         self.parent = parent  # Reference to the parent node
-        self.attributes = {}  # Node's attributes
-        if parent:
-            # Inherit parent attributes and prefix them with 'parent_'
-            self.attributes.update({'parent_' + k: v for k, v in parent.attributes.items()})
+        self.attributes = NodeAttributes(self)  # Node's attributes, parent ones resolved lazily
 
     # Method to set attributes of the node
     def set_attributes(self, **attributes):
@@ -92,99 +552,2139 @@ class MYNODE:
     # Return a list of parent nodes up the hierarchy
     def get_parent_list(self):
         """
-        Constructs a list of parent nodes up the hierarchy.
+        Constructs a list of parent nodes up the hierarchy.
+
+        Returns:
+        --------
+        list
+            A list of parent nodes in reverse order (from root to the current node).
+        """
+        node, parents = self, []
+        while node.parent:
+            parents.append(node.parent)
+            node = node.parent
+        return parents[::-1]
+
+# Convert an attribute value: hex, then integer, then float, else keep the string
+def _coerce_value(value):
+    try:
+        if value.startswith('0x'):
+            return int(value, 16)  # Parse hex value
+        return int(value)  # Parse integer
+    except ValueError:
+        try:
+            return float(value)  # Parse float
+        except ValueError:
+            return value  # Store as string if parsing fails
+
+# Fast converters used by the schema cache in MYDS._parse_attributes. Each one
+# returns exactly what _coerce_value would, or raises ValueError when the value
+# does not have the expected kind so that the caller falls back to _coerce_value.
+def _as_hex(value):
+    if value.startswith('0x'):
+        return int(value, 16)
+    raise ValueError(value)
+
+def _as_int(value):
+    return int(value)  # '0x..' raises, so hex values still take the slow path
+
+def _as_float(value):
+    # int() rejects anything containing these characters, so float() decides alone
+    if 'x' not in value and ('.' in value or 'e' in value or 'E' in value or 'n' in value or 'N' in value):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    raise ValueError(value)
+
+def _as_str(value):
+    # Only values starting like a number can parse as one
+    lead = value[:1]
+    if lead and (lead.isdecimal() or lead in '+-.iInN'):
+        raise ValueError(value)
+    return value
+
+# Pick the fast converter matching a value parsed by _coerce_value
+def _coercer_for(value, parsed):
+    if isinstance(parsed, int):
+        return _as_hex if value.startswith('0x') else _as_int
+    if isinstance(parsed, float):
+        return _as_float
+    return _as_str
+
+# Convert a numpy scalar to the equivalent Python value
+def _py(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+# Build a typed numpy array from the parsed values of one attribute
+def _column_array(values):
+    """
+    Converts a list of parsed attribute values into a numpy array, inferring the
+    narrowest dtype: int64 for integers, float64 for numbers, object otherwise
+    (strings, very large integers, or missing values stored as None).
+
+    Parameters:
+    -----------
+    values : list
+        The values of one attribute, one per row.
+
+    Returns:
+    --------
+    numpy.ndarray
+        The column array.
+    """
+    kinds = set(map(type, values))
+    try:
+        if kinds == {int}:
+            return np.array(values, dtype=np.int64)
+        if kinds <= {int, float}:
+            return np.array(values, dtype=np.float64)
+    except OverflowError:
+        pass  # Integers beyond int64 stay Python ints
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+# Convert timestamp strings to float64 seconds
+def _timestamp_array(values):
+    """
+    Converts timestamps (e.g. '526.384918775') to a float64 array of seconds.
+    Timestamps that are not numbers become NaN.
+
+    Parameters:
+    -----------
+    values : list
+        The timestamps as strings or numbers.
+
+    Returns:
+    --------
+    numpy.ndarray
+        The timestamps as float64.
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        timestamps = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                timestamps[i] = float(value)
+            except ValueError:
+                timestamps[i] = np.nan
+        return timestamps
+
+# Layout of the index sidecar written next to a log (see MYDS.save_index)
+INDEX_SUFFIX = ".lpidx"
+INDEX_TEMP_SUFFIX = INDEX_SUFFIX + ".tmp"  # Written first, then renamed into place
+INDEX_MAGIC = b"LPIDX\n"
+INDEX_VERSION = 7
+INDEX_ALIGN = 64  # Array data offsets are aligned for the array views
+INDEX_SAMPLE_BYTES = 1024 * 1024  # Bytes hashed at each end of the log
+
+# Identify the exact contents of a log file cheaply
+def _fingerprint(path):
+    """
+    Computes the key under which the index of a log file is stored: its size,
+    modification time and a BLAKE2 hash of its first and last INDEX_SAMPLE_BYTES.
+    Hashing the ends of the file catches logs that were rewritten or appended to
+    without reading multi-gigabyte files in full.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+
+    Returns:
+    --------
+    list
+        [size, mtime in nanoseconds, hex digest].
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        digest.update(file.read(INDEX_SAMPLE_BYTES))
+        if stat.st_size > 2 * INDEX_SAMPLE_BYTES:
+            file.seek(-INDEX_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(file.read(INDEX_SAMPLE_BYTES))
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+# Magic numbers of the compressed log formats read by open_log
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+BLOCK_SPACING = 4 * 1024 * 1024  # Decompressed bytes between two checkpoints of a BlockIndex
+COMPRESSED_READ_BYTES = 256 * 1024  # Compressed bytes read at a time
+
+# Tell which compression a log file uses
+def detect_compression(path):
+    """
+    Detects the compression of a file from its first bytes.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+
+    Returns:
+    --------
+    str or None
+        'gzip', 'xz' or 'zstd', or None for plain text.
+    """
+    with open(path, "rb") as file:
+        head = file.read(8)
+    for kind, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+# BlockIndex remembers where decompression can resume inside a compressed log
+class BlockIndex:
+    """
+    Checkpoints inside a compressed log, collected while it is read. A checkpoint
+    pairs a decompressed offset with the compressed offset at which decompression
+    continues from there and, for gzip, a copy of the decompressor state (xz and
+    zstd decompressors cannot be copied, so for those only the starts of streams
+    and frames are checkpoints). Seeking restores the nearest checkpoint before
+    the target instead of decompressing from the start of the file.
+
+    Attributes:
+    -----------
+    offsets : list
+        The decompressed offset of every checkpoint, in ascending order.
+    checkpoints : list
+        (decompressed offset, compressed offset, decompressor or None) tuples;
+        None means a fresh decompressor.
+    """
+    def __init__(self):
+        self.offsets = [0]
+        self.checkpoints = [(0, 0, None)]
+
+    # Check whether a checkpoint at an offset would be far enough from the last one
+    def due(self, decompressed):
+        return decompressed >= self.offsets[-1] + BLOCK_SPACING
+
+    # Record a checkpoint
+    def add(self, decompressed, compressed, decoder):
+        """
+        Records a checkpoint. Callers check due() first, so checkpoints are at least
+        BLOCK_SPACING decompressed bytes apart.
+
+        Parameters:
+        -----------
+        decompressed : int
+            The number of decompressed bytes produced so far.
+        compressed : int
+            The compressed offset of the next input byte.
+        decoder : object or None
+            A copy of the decompressor state, or None at the start of a stream.
+        """
+        if self.due(decompressed):  # Another reader may have added it meanwhile
+            self.offsets.append(decompressed)
+            self.checkpoints.append((decompressed, compressed, decoder))
+
+    # Find the checkpoint to resume from
+    def find(self, offset):
+        """
+        Returns the last checkpoint at or before a decompressed offset.
+        """
+        return self.checkpoints[bisect.bisect_right(self.offsets, offset) - 1]
+
+# CompressedLog reads a gzip, xz or zstd log as a seekable stream of bytes
+class CompressedLog(io.RawIOBase):
+    """
+    Raw binary stream over the decompressed contents of a log file. Decompression
+    happens block by block as the stream is read, so the file is never expanded on
+    disk or in memory. Concatenated gzip members, xz streams and zstd frames are
+    read one after another. seek() jumps through the BlockIndex of the file, which
+    is filled in while the file is read and shared by all readers of the file.
+    Use open_log to get a buffered reader.
+    """
+    def __init__(self, path, block_index):
+        """
+        Opens a compressed log.
+
+        Parameters:
+        -----------
+        path : str
+            The file path of the compressed log.
+        block_index : BlockIndex
+            The checkpoints of the file (possibly empty).
+        """
+        super().__init__()
+        self.kind = detect_compression(path)
+        if self.kind == 'zstd' and zstandard is None:
+            raise ValueError(f"{path} is zstd-compressed; install the 'zstandard' package to read it")
+        self.block_index = block_index
+        self._file = open(path, "rb")
+        self._restore(block_index.checkpoints[0])
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    # Position in the compressed file, for progress reports
+    def compressed_tell(self):
+        return self._file.tell() - len(self._unused)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+    # Create a decompressor for the start of a stream
+    def _new_decoder(self):
+        if self.kind == 'gzip':
+            return zlib.decompressobj(zlib.MAX_WBITS | 16)
+        if self.kind == 'xz':
+            return lzma.LZMADecompressor()
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    # Continue decompressing from a checkpoint
+    def _restore(self, checkpoint):
+        decompressed, compressed, decoder = checkpoint
+        self._file.seek(compressed)
+        self._decoder = decoder.copy() if decoder is not None else self._new_decoder()
+        self._fresh = decoder is None  # No input fed to the decompressor yet
+        self._unused = b''  # Compressed bytes read but not yet fed
+        self._pending = b''  # Last decompressed block
+        self._start = 0  # Bytes of _pending already returned
+        self._pos = decompressed  # Decompressed offset of _pending[_start]
+
+    # Decompress the next block of input
+    def _fill(self):
+        data = self._unused or self._file.read(COMPRESSED_READ_BYTES)
+        self._unused = b''
+        if not data:
+            return False  # End of the file (or a truncated last stream)
+        self._pending = self._pending[self._start:] + self._decoder.decompress(data)
+        self._start = 0
+        self._fresh = False
+        if self._decoder.eof:  # End of a gzip member, xz stream or zstd frame
+            self._unused = self._decoder.unused_data
+            self._decoder = self._new_decoder()
+            self._fresh = True
+        decompressed = self._pos + len(self._pending)
+        if (self._fresh or self.kind == 'gzip') and self.block_index.due(decompressed):
+            self.block_index.add(decompressed, self._file.tell() - len(self._unused),
+                                 None if self._fresh else self._decoder.copy())
+        return True
+
+    def readinto(self, buffer):
+        while self._start == len(self._pending):
+            if not self._fill():
+                return 0
+        count = min(len(buffer), len(self._pending) - self._start)
+        buffer[:count] = self._pending[self._start:self._start + count]
+        self._start += count
+        self._pos += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("can only seek from the start or the current position")
+        checkpoint = self.block_index.find(offset)
+        if offset < self._pos or checkpoint[0] > self._pos + len(self._pending) - self._start:
+            self._restore(checkpoint)
+        while self._pos < offset:  # Decompress up to the target
+            if self._start == len(self._pending) and not self._fill():
+                break
+            skip = min(offset - self._pos, len(self._pending) - self._start)
+            self._start += skip
+            self._pos += skip
+        return self._pos
+
+# Block indexes of the compressed logs opened so far, by path and file state
+_block_indexes = {}
+
+# Open a log file for reading bytes, decompressing it if needed
+def open_log(path):
+    """
+    Opens a log file as a binary stream. gzip (.gz), xz (.xz) and zstd (.zst)
+    files are recognized by their contents and decompressed on the fly (zstd needs
+    the optional 'zstandard' package); other files are opened as they are. The
+    returned stream supports seek() in both cases; for compressed files seeking
+    uses the file's BlockIndex, which is kept for the file as long as it does not
+    change.
+
+    Parameters:
+    -----------
+    path : str
+        The file path of the log file.
+
+    Returns:
+    --------
+    io.BufferedReader
+        A buffered binary stream of the (decompressed) log.
+    """
+    if detect_compression(path) is None:
+        return open(path, "rb")
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    block_index = _block_indexes.get(key)
+    if block_index is None:
+        block_index = _block_indexes[key] = BlockIndex()
+    return io.BufferedReader(CompressedLog(path, block_index), buffer_size=COMPRESSED_READ_BYTES)
+
+_NO_ROWS = np.empty(0, dtype=np.int64)
+
+# ValueIndex finds the rows holding a value of a column
+class ValueIndex:
+    """
+    Inverted index of a column kept as three arrays: the distinct values in
+    ascending order, the row indices sorted by value (ascending within a value)
+    and the bounds of each value's run of rows. A lookup is a binary search, and
+    the index takes about as much memory as the column whatever the number of
+    distinct values. None entries are left out. Object columns whose values do
+    not sort (e.g. strings mixed with numbers) are not indexed; their lookups
+    compare the column instead.
+
+    Attributes:
+    -----------
+    values : numpy.ndarray
+        The distinct values, ascending.
+    order : numpy.ndarray
+        The row indices, sorted by value.
+    bounds : numpy.ndarray
+        order[bounds[i]:bounds[i + 1]] are the rows holding values[i].
+    column : numpy.ndarray or None
+        The column, if it could not be indexed.
+    """
+    def __init__(self, column):
+        self.column = None
+        self.numeric = column.dtype.kind in 'iuf'
+        if self.numeric:
+            order = np.argsort(column, kind='stable')
+        else:
+            present = np.flatnonzero(~np.equal(column, None).astype(bool))
+            try:
+                order = present[np.argsort(column[present], kind='stable')]
+            except TypeError:  # Values of different kinds do not sort
+                self.column = column
+                self.values = self.order = self.bounds = _NO_ROWS
+                return
+        ordered = column[order]
+        starts = np.flatnonzero(np.concatenate(([True], np.not_equal(ordered[1:], ordered[:-1]).astype(bool)))) if len(order) else _NO_ROWS
+        self.values = ordered[starts]
+        self.order = order
+        self.bounds = np.append(starts, len(order))
+
+    # Rows holding one value
+    def rows(self, value):
+        """
+        Returns the ascending indices of the rows equal to a value (already
+        converted like an attribute value).
+        """
+        if value is None:
+            return _NO_ROWS
+        if self.column is not None:
+            return np.flatnonzero(np.equal(self.column, value).astype(bool))
+        if self.numeric and not isinstance(value, (int, float)):
+            return _NO_ROWS
+        try:
+            i = int(np.searchsorted(self.values, value))
+        except (TypeError, OverflowError):  # Not comparable with the values
+            return _NO_ROWS
+        if i == len(self.values) or not self.values[i] == value:
+            return _NO_ROWS
+        return self.order[self.bounds[i]:self.bounds[i + 1]]
+
+    # Rows holding any of several numeric values
+    def rows_of(self, values):
+        """
+        Returns the ascending indices of the rows equal to any of the given
+        values (an ascending numeric array).
+        """
+        positions = np.searchsorted(self.values, values)
+        found = positions < len(self.values)
+        found[found] = self.values[positions[found]] == values[found]
+        runs = [self.order[self.bounds[i]:self.bounds[i + 1]] for i in positions[found].tolist()]
+        return np.sort(np.concatenate(runs)) if runs else _NO_ROWS
+
+
+# _RawText holds the undecoded attribute strings of a table loaded from an index
+class _RawText:
+    """
+    The raw attribute strings of the rows of a table as one UTF-8 byte array
+    and the offsets of the rows in it, as stored by MYDS.save_index. The strings
+    are only decoded when the table is (see MYTABLE._decode); until then the
+    arrays stay views of the memory-mapped index. Converts to an object array of
+    str wherever one is expected.
+
+    Attributes:
+    -----------
+    offsets : numpy.ndarray
+        The start of every row in data, plus the end of the last one.
+    data : numpy.ndarray
+        The uint8 bytes of all rows.
+    """
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    # Encode an object array of strings
+    @classmethod
+    def encode(cls, raw):
+        parts = [text.encode('utf-8') for text in raw.tolist()]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(part) for part in parts], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b''.join(parts), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def tolist(self):
+        data, bounds = self.data.tobytes(), self.offsets.tolist()
+        return [data[start:end].decode('utf-8') for start, end in zip(bounds, bounds[1:])]
+
+    def __array__(self, dtype=None, copy=None):
+        raw = np.empty(len(self), dtype=object)
+        raw[:] = self.tolist()
+        return raw
+
+    def __getitem__(self, rows):
+        return np.asarray(self)[rows]
+
+# MYTABLE class stores all entries of one message type column by column
+class MYTABLE:
+    """
+    MYTABLE class stores every entry of a single message type in columnar form:
+    one numpy array per attribute plus arrays for the timestamps, the global entry
+    number (seq) and the seq of the enclosing _START entry. Rows are kept sorted by
+    timestamp so time ranges can be found by binary search. Iterating or indexing
+    a table yields (timestamp, MYNODE) pairs built on demand, so code written
+    against the old list-of-nodes lookup keeps working. A table filled by a lazy
+    parse keeps the raw attribute text of its rows and decodes all of its columns
+    the first time they are accessed.
+
+    Attributes:
+    -----------
+    name : str
+        The message type stored in the table.
+    timestamps : numpy.ndarray
+        The timestamp of every row as float64 seconds, in ascending order.
+    seqs : numpy.ndarray
+        The global entry number of every row (position among all parsed entries).
+    parents : numpy.ndarray
+        The seq of the parent entry of every row, or -1 for top-level rows.
+    columns : dict
+        Attribute name -> numpy array with one value per row (decoded on first access).
+    dataset : MYDS
+        The dataset the table belongs to (used to resolve parents).
+    """
+    def __init__(self, name, dataset):
+        """
+        Initializes an empty table for a message type.
+
+        Parameters:
+        -----------
+        name : str
+            The message type stored in the table.
+        dataset : MYDS
+            The dataset the table belongs to.
+        """
+        self.name = name
+        self.dataset = dataset
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.seqs = np.empty(0, dtype=np.int64)
+        self.parents = np.empty(0, dtype=np.int64)
+        self._columns = {}
+        self._raw = None  # Undecoded attribute strings of every row (lazy parsing), or a _RawText
+        self._value_index = {}  # Attribute name -> inverted index, see value_rows
+        self._children = None  # Inverted index of parents, see child_rows
+        self._rollups = {}  # Attribute name (None for the entries) -> Rollup, see rollup
+        self._indexed = 0  # dataset.count when the inverted indexes were last valid
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def __getitem__(self, row):
+        return _py(self.timestamps[row]), self.dataset.node(self.seqs[row])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    @property
+    def columns(self):
+        if self._raw is not None:
+            self._decode()
+        return self._columns
+
+    # Decode the raw attribute strings of a lazily parsed table
+    def _decode(self):
+        """
+        Parses the raw attribute strings of every row into columns and drops them.
+        Rows are decoded in file (seq) order, so the attributes come out in the same
+        order as with an eager parse.
+        """
+        raw, self._raw = self._raw, None
+        order = np.argsort(self.seqs, kind='stable')
+        in_order = bool((order == np.arange(len(order))).all())
+        builder = _TableBuilder(lazy=True)
+        builder.raw = raw.tolist() if in_order else raw[order].tolist()
+        builder.decode(self.dataset, self.name)
+        self._columns = builder.column_arrays(len(raw))
+        if not in_order:
+            rows = np.empty_like(order)
+            rows[order] = np.arange(len(order))
+            self._columns = {key: column[rows] for key, column in self._columns.items()}
+
+    # Find the rows inside a time range
+    def time_range(self, start_time=None, end_time=None):
+        """
+        Returns the row range whose timestamps fall within [start_time, end_time],
+        found by binary search on the sorted timestamps.
+
+        Parameters:
+        -----------
+        start_time : float, optional
+            The first timestamp to include (default is the beginning).
+        end_time : float, optional
+            The last timestamp to include (default is the end).
+
+        Returns:
+        --------
+        tuple
+            (first row, row after the last) of the range.
+        """
+        first = 0 if start_time is None else int(np.searchsorted(self.timestamps, start_time, side='left'))
+        last = len(self) if end_time is None else int(np.searchsorted(self.timestamps, end_time, side='right'))
+        return first, max(first, last)
+
+    # Get the values of one attribute for every row
+    def column(self, key):
+        """
+        Returns the array of values of an attribute. Keys prefixed with 'parent_'
+        that are not attributes of the table are resolved through the parent rows,
+        matching the inherited 'parent_' attributes of MYNODE.
+
+        Parameters:
+        -----------
+        key : str
+            The attribute name.
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            The column, or None if no row has the attribute.
+        """
+        if key in self.columns:
+            return self.columns[key]
+        if not key.startswith('parent_'):
+            return None
+        values = np.full(len(self), None, dtype=object)
+        found = False
+        has_parent = np.flatnonzero(self.parents >= 0)
+        parent_seqs = self.parents[has_parent]
+        parent_types = self.dataset.seq_types[parent_seqs]
+        for type_id in np.unique(parent_types):
+            same_type = parent_types == type_id
+            parent_table = self.dataset.lookup[self.dataset.type_names[type_id]]
+            parent_column = parent_table.column(key[len('parent_'):])
+            if parent_column is not None:
+                values[has_parent[same_type]] = parent_column[self.dataset.seq_rows[parent_seqs[same_type]]]
+                found = True
+        if not found:
+            return None
+        return values if any(value is None for value in values) else _column_array(values.tolist())
+
+    # Find the rows holding an attribute value
+    def value_rows(self, key, value):
+        """
+        Returns the rows whose attribute equals a value. The first lookup of an
+        attribute builds an inverted index of its column (see ValueIndex), which
+        is kept until the dataset grows, so repeated equality filters on the same
+        attribute are binary searches.
+
+        Parameters:
+        -----------
+        key : str
+            The attribute name ('parent_' keys as in column()).
+        value : str or int or float
+            The value, already converted like an attribute value.
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            The ascending row indices, or None if no row has the attribute.
+        """
+        self._check_indexes()
+        if key not in self._value_index:
+            column = self.column(key)
+            self._value_index[key] = None if column is None else ValueIndex(column)
+        index = self._value_index[key]
+        if index is None:
+            return None
+        return index.rows(value)
+
+    # Find the rows whose parent is one of the given entries
+    def child_rows(self, parent_seqs):
+        """
+        Returns the rows whose parent entry is one of the given seqs, through an
+        inverted index of the parents kept like the indexes of value_rows.
+
+        Parameters:
+        -----------
+        parent_seqs : array-like
+            The seqs of the parent (_START) entries.
+
+        Returns:
+        --------
+        numpy.ndarray
+            The ascending row indices.
+        """
+        parent_seqs = np.unique(np.asarray(parent_seqs, dtype=np.int64))
+        if len(parent_seqs) > len(self) // 64:
+            return np.flatnonzero(np.isin(self.parents, parent_seqs))  # Most rows are candidates anyway
+        self._check_indexes()
+        if self._children is None:
+            self._children = ValueIndex(self.parents)
+        return self._children.rows_of(parent_seqs)
+
+    # Drop the inverted indexes once the dataset has grown
+    def _check_indexes(self):
+        if self._indexed != self.dataset.count:
+            self._value_index, self._children, self._rollups, self._indexed = {}, None, {}, self.dataset.count
+
+    # Get the rollup pyramid of an attribute
+    def rollup(self, key):
+        """
+        Returns the Rollup of an attribute, built on first use and kept like the
+        inverted indexes of value_rows.
+
+        Parameters:
+        -----------
+        key : str or None
+            The attribute name, or None to count the entries only.
+
+        Returns:
+        --------
+        Rollup or None
+            The rollup, or None if no row has the attribute.
+        """
+        self._check_indexes()
+        if key not in self._rollups:
+            if key is None:
+                values = np.zeros(len(self))
+            else:
+                column = self.column(key)
+                values = None if column is None else _numeric(column)
+            self._rollups[key] = None if values is None else Rollup.build(self.timestamps, values, self.seqs)
+        return self._rollups[key]
+
+    # Get the attributes of one row as a dictionary
+    def row_attributes(self, row):
+        """
+        Returns the attributes stored for a row, without inherited parent attributes.
+
+        Parameters:
+        -----------
+        row : int
+            The row index within the table.
+
+        Returns:
+        --------
+        dict
+            Attribute name -> Python value for the attributes present on the row.
+        """
+        attributes = {}
+        for key, column in self.columns.items():
+            value = column[row]
+            if value is not None:
+                attributes[key] = _py(value)
+        return attributes
+
+    # Append the rows collected by a _TableBuilder
+    def extend(self, builder):
+        """
+        Appends the rows collected by a builder, converting them to typed arrays.
+        Attributes missing on either side are filled with None. Raw attribute
+        strings of a lazy builder are kept as they are unless the table has already
+        been decoded. If the new rows are not in time order, the table is re-sorted
+        (stably) and the dataset's seq -> row mapping is updated.
+
+        Parameters:
+        -----------
+        builder : _TableBuilder
+            The builder holding the new rows.
+        """
+        old_count, new_count = len(self), len(builder.seqs)
+        if builder.lazy and (old_count == 0 or self._raw is not None):
+            raw = np.empty(new_count, dtype=object)
+            raw[:] = builder.raw
+            self._raw = raw if old_count == 0 else np.concatenate((self._raw, raw))
+        else:
+            if builder.lazy:
+                builder.decode(self.dataset, self.name)
+            columns = {}
+            for key in list(self.columns) + [key for key in builder.columns if key not in self.columns]:
+                new_values = builder.columns.get(key, [])
+                new_values = new_values + [None] * (new_count - len(new_values))
+                if old_count == 0:
+                    columns[key] = _column_array(new_values)
+                    continue
+                old_values = self.columns.get(key)
+                if old_values is None:
+                    old_values = np.full(old_count, None, dtype=object)
+                columns[key] = np.concatenate((old_values, _column_array(new_values)))
+                if columns[key].dtype == object:
+                    columns[key] = _column_array(columns[key].tolist())
+            self._columns = columns
+        self.timestamps = np.concatenate((self.timestamps, _timestamp_array(builder.timestamps)))
+        self.seqs = np.concatenate((self.seqs, np.array(builder.seqs, dtype=np.int64)))
+        self.parents = np.concatenate((self.parents, np.array(builder.parents, dtype=np.int64)))
+        if len(self) > 1 and not (self.timestamps[1:] >= self.timestamps[:-1]).all():
+            order = np.argsort(self.timestamps, kind='stable')  # NaN timestamps sort last
+            self.timestamps, self.seqs, self.parents = self.timestamps[order], self.seqs[order], self.parents[order]
+            if self._raw is not None:
+                self._raw = self._raw[order]
+            else:
+                self._columns = {key: column[order] for key, column in self._columns.items()}
+            self.dataset.seq_rows[self.seqs] = np.arange(len(self))
+
+# _TableBuilder collects the rows of one message type while a log is parsed
+class _TableBuilder:
+    """
+    Collects rows of one message type in plain Python lists during parsing.
+    MYDS._finalize turns the lists into the arrays of a MYTABLE. A lazy builder
+    stores the raw attribute string of each row instead of its parsed attributes.
+    """
+    def __init__(self, lazy=False):
+        self.lazy = lazy
+        self.timestamps = []
+        self.seqs = []
+        self.parents = []
+        self.columns = {}  # Attribute name -> list of values (None where missing)
+        self.raw = []  # Raw attribute strings (lazy builders only)
+
+    def append(self, timestamp, seq, parent, attributes):
+        count = len(self.seqs)
+        self.timestamps.append(timestamp)
+        self.seqs.append(seq)
+        self.parents.append(parent)
+        if self.lazy:
+            self.raw.append(attributes)
+        else:
+            self.add_attributes(count, attributes)
+
+    # Add the parsed attributes of one row to the columns
+    def add_attributes(self, count, attributes):
+        columns = self.columns
+        for key, value in attributes.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * count
+            elif len(column) < count:
+                column.extend([None] * (count - len(column)))  # Key missing on earlier rows
+            column.append(value)
+
+    # Parse the raw attribute strings of a lazy builder into columns
+    def decode(self, dataset, message_type):
+        parse = dataset._parse_attributes
+        for row, attributes_str in enumerate(self.raw):
+            self.add_attributes(row, parse(attributes_str, message_type))
+        self.raw, self.lazy = [], False
+
+    # Convert the collected columns to arrays of count rows
+    def column_arrays(self, count):
+        return {key: _column_array(values + [None] * (count - len(values))) for key, values in self.columns.items()}
+
+# Convert values to float64, NaN for those that are not numbers
+def _numeric(values):
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    return np.array([value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan for value in values.tolist()], dtype=np.float64)
+
+# Summarize values per time bucket
+def _bucket_stats(times, values, seqs, width):
+    """
+    Returns (bucket ids, counts, sums, minima, maxima, first seqs) of the
+    non-empty buckets of the given width, for entries sorted by time. Bucket i
+    covers [i * width, (i + 1) * width); entries with a NaN time or value are
+    left out.
+    """
+    keep = ~(np.isnan(times) | np.isnan(values))
+    times, values, seqs = times[keep], values[keep], seqs[keep]
+    ids = np.floor(times / width).astype(np.int64)
+    if not len(ids):
+        return tuple(np.empty(0, dtype=dtype) for dtype in (np.int64, np.int64, np.float64, np.float64, np.float64, np.int64))
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    return (ids[starts], np.diff(np.append(starts, len(ids))), np.add.reduceat(values, starts),
+            np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts), np.minimum.reduceat(seqs, starts))
+
+# Combine bucket summaries with equal bucket ids
+def _merge_stats(parts):
+    """
+    Merges _bucket_stats results (for the same width) into one, in bucket order.
+    """
+    ids, counts, sums, mins, maxs, firsts = (np.concatenate(arrays) for arrays in zip(*parts))
+    if len(parts) > 1:
+        order = np.argsort(ids, kind='stable')
+        ids, counts, sums, mins, maxs, firsts = ids[order], counts[order], sums[order], mins[order], maxs[order], firsts[order]
+    if not len(ids):
+        return ids, counts, sums, mins, maxs, firsts
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+    if len(starts) == len(ids):
+        return ids, counts, sums, mins, maxs, firsts
+    return (ids[starts], np.add.reduceat(counts, starts), np.add.reduceat(sums, starts),
+            np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts), np.minimum.reduceat(firsts, starts))
+
+ROLLUP_BASE_BUCKETS = 1 << 16  # Buckets spanning the time range of a table at the finest rollup level
+ROLLUP_PIXELS = 2000  # Buckets fetched for a window when the plot width is not known
+
+# Smallest power of two at least as large as a bucket width
+def _bucket_width(width, magnitude):
+    """
+    Rounds a bucket width up to a power of two, and to the precision of float64
+    times of the given magnitude (so that bucket ids stay exact).
+    """
+    precision = max(abs(magnitude), 1.0) / 2.0 ** 52
+    return float(2.0 ** np.ceil(np.log2(max(width, precision))))
+
+# Rollup is a multi-resolution summary of one attribute of a table
+class Rollup:
+    """
+    Pyramid of per-bucket count, sum, minimum, maximum and first seq of one
+    attribute, at power-of-two bucket widths (in seconds). Level 0 has about
+    ROLLUP_BASE_BUCKETS buckets over the time range of the table; every further
+    level halves the resolution, up to a single bucket. Buckets are aligned to
+    multiples of their width and only non-empty ones are stored, so fetching a
+    window at a given resolution costs O(buckets returned).
+
+    Attributes:
+    -----------
+    base : float
+        The bucket width of level 0, a power of two.
+    levels : list
+        One (ids, counts, sums, minima, maxima, first seqs) tuple per level, see
+        _bucket_stats.
+    """
+    def __init__(self, base, levels):
+        self.base = base
+        self.levels = levels
+
+    # Build the pyramid of a table column
+    @classmethod
+    def build(cls, timestamps, values, seqs):
+        """
+        Builds the rollup of an attribute from the timestamps (ascending), numeric
+        values (NaN where missing) and seqs of a table.
+        """
+        finite = timestamps[~np.isnan(timestamps)]
+        span = float(finite[-1] - finite[0]) if len(finite) else 0.0
+        magnitude = max(abs(float(finite[0])), abs(float(finite[-1]))) if len(finite) else 0.0
+        base = _bucket_width(max(span, 1e-6) / ROLLUP_BASE_BUCKETS / 2, magnitude)
+        levels = [_bucket_stats(timestamps, values, seqs, base)]
+        while len(levels[-1][0]) > 1:
+            ids, counts, sums, mins, maxs, firsts = levels[-1]
+            levels.append(_merge_stats([(ids >> 1, counts, sums, mins, maxs, firsts)]))
+        return cls(base, levels)
+
+    # Get the buckets of a window
+    def fetch(self, width, first, last):
+        """
+        Returns the buckets of the given width with ids first to last (inclusive).
+
+        Parameters:
+        -----------
+        width : float
+            The bucket width, a power of two.
+        first, last : int
+            The range of bucket ids.
+
+        Returns:
+        --------
+        tuple or None
+            The buckets in the format of _bucket_stats, or None if the width is
+            finer than level 0.
+        """
+        level = int(round(np.log2(width / self.base)))
+        if level < 0:
+            return None
+        shift = max(0, level - len(self.levels) + 1)  # Levels above the top one hold the same single bucket
+        ids, counts, sums, mins, maxs, firsts = self.levels[min(level, len(self.levels) - 1)]
+        ids = ids >> shift
+        low, high = np.searchsorted(ids, first, side='left'), np.searchsorted(ids, last, side='right')
+        return ids[low:high], counts[low:high], sums[low:high], mins[low:high], maxs[low:high], firsts[low:high]
+
+# SpanTable indexes the _START/_END spans of a dataset
+class SpanTable:
+    """
+    The spans of a dataset: one row per _START entry, in file order, closed by the
+    next _END entry at the same nesting level. Row numbers are span ids. Built from
+    the parent links of the tables, so it needs no extra work while parsing.
+
+    Spans nest in file order, so they form a tree of disjoint or nested
+    intervals: span_at(t) is a binary search over start times followed by a
+    short walk up the span tree (nested spans cover nested time ranges), and
+    select() finds the spans of a parent filter through the inverted indexes of
+    the _START tables.
+
+    Attributes:
+    -----------
+    start_seqs : numpy.ndarray
+        The seq of the _START entry of every span (ascending).
+    end_seqs : numpy.ndarray
+        The seq of the closing _END entry, or the entry count for spans that are
+        still open.
+    start_times : numpy.ndarray
+        The timestamp of the _START entry.
+    end_times : numpy.ndarray
+        The timestamp of the _END entry, inf for open spans.
+    depths : numpy.ndarray
+        The nesting depth (0 for outermost spans).
+    parents : numpy.ndarray
+        The span id of the enclosing span, or -1.
+    types : numpy.ndarray
+        The type id (index into MYDS.type_names) of the _START entry.
+    count : int
+        The number of dataset entries the table was built from.
+    """
+    def __init__(self, dataset):
+        """
+        Builds the span table of a dataset.
+
+        Parameters:
+        -----------
+        dataset : MYDS
+            The parsed dataset.
+        """
+        self.dataset = dataset
+        self.count = dataset.count
+        start_tables = [table for name, table in dataset.lookup.items() if name.endswith("_START")]
+        seqs = np.concatenate([table.seqs for table in start_tables] + [np.empty(0, dtype=np.int64)]).astype(np.int64)
+        order = np.argsort(seqs, kind='stable')
+        self.start_seqs = seqs[order]
+        self.start_times = np.concatenate([table.timestamps for table in start_tables] + [np.empty(0)]).astype(np.float64)[order]
+        start_parents = np.concatenate([table.parents for table in start_tables] + [np.empty(0, dtype=np.int64)]).astype(np.int64)[order]
+        self.types = dataset.seq_types[self.start_seqs]
+        self.parents = self.find(start_parents)
+
+        # An _END entry is stored with the _START it closes as its parent
+        self.end_seqs = np.full(len(self.start_seqs), self.count, dtype=np.int64)
+        self.end_times = np.full(len(self.start_seqs), np.inf)
+        for name, table in dataset.lookup.items():
+            if name.endswith("_END"):
+                spans = self.find(table.parents)
+                closed = spans >= 0
+                self.end_seqs[spans[closed]] = table.seqs[closed]
+                self.end_times[spans[closed]] = table.timestamps[closed]
+
+        # Depths: a span is one level below its parent, which always comes first
+        self.depths = np.zeros(len(self.start_seqs), dtype=np.int32)
+        nested = np.flatnonzero(self.parents >= 0)
+        while len(nested):
+            depths = self.depths[self.parents[nested]] + 1
+            if np.array_equal(depths, self.depths[nested]):
+                break
+            self.depths[nested] = depths
+
+        self._time_order = np.argsort(self.start_times, kind='stable')
+        self._sorted_times = self.start_times[self._time_order]
+
+    def __len__(self):
+        return len(self.start_seqs)
+
+    # Span ids of _START seqs
+    def find(self, seqs):
+        """
+        Returns the span id of every seq that is a _START entry, -1 for the others.
+        """
+        seqs = np.asarray(seqs, dtype=np.int64)
+        if not len(self.start_seqs):
+            return np.full(len(seqs), -1, dtype=np.int64)
+        spans = np.searchsorted(self.start_seqs, seqs)
+        found = spans < len(self.start_seqs)
+        found[found] = self.start_seqs[spans[found]] == seqs[found]
+        return np.where(found, spans, -1)
+
+    # Innermost span open at a given time
+    def span_at(self, t):
+        """
+        Returns the id of the innermost span whose time range contains t, or -1.
+
+        Parameters:
+        -----------
+        t : float
+            The time in seconds.
+
+        Returns:
+        --------
+        int
+            The span id.
+        """
+        i = int(np.searchsorted(self._sorted_times, t, side='right')) - 1
+        span = int(self._time_order[i]) if i >= 0 else -1
+        while span >= 0 and not self.end_times[span] >= t:
+            span = int(self.parents[span])
+        return span
+
+    # Spans whose _START entry has an attribute value
+    def select(self, key, value):
+        """
+        Returns the ids of the spans whose _START entry has key == value (compared
+        like the attribute filters of Query, through MYTABLE.value_rows).
+
+        Parameters:
+        -----------
+        key : str
+            The attribute name.
+        value : str or int or float
+            The attribute value; text is converted like an attribute value.
+
+        Returns:
+        --------
+        numpy.ndarray
+            The span ids in ascending order.
+        """
+        value = _coerce_value(value) if isinstance(value, str) else value
+        seqs = []
+        for name, table in self.dataset.lookup.items():
+            if name.endswith("_START"):
+                rows = table.value_rows(key, value)
+                if rows is not None:
+                    seqs.append(table.seqs[rows])
+        if not seqs:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(self.find(np.concatenate(seqs)))
+
+# Raised by the parse methods when their cancel token is set
+class ParseCancelled(Exception):
+    """
+    Raised when a parse is cancelled through the cancel token of the dataset.
+    The dataset is left partially filled and should be discarded.
+    """
+
+PROGRESS_BYTES = 1024 * 1024  # Input bytes between two progress/cancel checks
+_generations = itertools.count(1)  # Source of MYDS.generation
+PROGRESS_INTERVAL = 0.1  # Minimum seconds between two progress callbacks
+
+# MYDS class represents the dataset and parsing logic
+class MYDS:
+    """
+    MYDS class represents the dataset of entries parsed from a log file. It includes
+    methods to parse the log lines, manage the entry hierarchy, and store the entries
+    in one columnar MYTABLE per message type.
+
+    Attributes:
+    -----------
+    lookup : dict
+        A dictionary mapping each message type to its MYTABLE.
+    MIN : float
+        The minimum timestamp in the dataset, in seconds.
+    MAX : float
+        The maximum timestamp in the dataset, in seconds.
+    count : int
+        The number of parsed entries. Entries are numbered (seq) in file order.
+    type_names : list
+        The message types in order of first appearance; the index is the type id.
+    seq_types : numpy.ndarray
+        The type id of every entry, indexed by seq.
+    seq_rows : numpy.ndarray
+        The row of every entry within its MYTABLE, indexed by seq.
+    offset : int
+        The number of bytes of the log file parsed so far.
+    open_spans : list
+        The seqs of the _START entries that are still open at offset.
+    lazy : bool
+        Whether attribute strings are kept raw while parsing and only decoded,
+        one message type at a time, when the columns of the type are first used.
+    keep_types : set or None
+        The message types to store (plus every _START and _END type), or None for all.
+    keep_attributes : set or None
+        The attribute names to store, or None for all.
+    skipped : dict
+        Message type -> number of entries left out because of keep_types.
+    line_offsets : numpy.ndarray
+        The offset at which every parsed line starts, plus the end of the last one.
+        The files of the dataset are numbered as if they were concatenated (see
+        sources), so the index of an offset is a line index over all files.
+    seq_lines : numpy.ndarray
+        The line index of every entry, indexed by seq.
+    sources : list
+        [path, first offset, first line index] of every parsed file, in order.
+    progress : callable or None
+        Called as progress(done, total) with the input bytes parsed so far and in
+        total (None if unknown), at most every PROGRESS_INTERVAL seconds.
+    cancel : object or None
+        A cancel token such as threading.Event; once cancel.is_set() is true the
+        parse methods raise ParseCancelled.
+    log_format : str
+        The name of the registered log format the lines are scanned with (see
+        register_format).
+    spans : SpanTable
+        The _START/_END spans, built on first use and again after the dataset grew.
+    scan : callable
+        The scan function of log_format.
+    generation : int
+        A number that changes whenever the entries change (reset, parse, update),
+        unique across datasets; query results are cached per generation.
+    """
+    def __init__(self, lazy=False, keep_types=None, keep_attributes=None, progress=None, cancel=None, log_format=DEFAULT_FORMAT):
+        """
+        Initializes the MYDS dataset with an empty lookup dictionary and default
+        minimum and maximum timestamps.
+
+        Parameters:
+        -----------
+        lazy : bool, optional
+            Whether to decode attributes lazily (default is False).
+        keep_types : iterable, optional
+            The message types to store (default is all), see project().
+        keep_attributes : iterable, optional
+            The attribute names to store (default is all), see project().
+        progress : callable, optional
+            The progress callback (default is none).
+        cancel : object, optional
+            The cancel token (default is none).
+        log_format : str, optional
+            The log format (default is DEFAULT_FORMAT).
+        """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format {log_format!r}, expected one of {', '.join(LOG_FORMATS)}")
+        self.log_format = log_format
+        self.scan = LOG_FORMATS[log_format][0]
+        self.lazy = lazy
+        self.progress = progress
+        self.cancel = cancel
+        self._next_report = 0.0  # time.monotonic() of the next progress callback
+        self.project(keep_types, keep_attributes)
+        self.reset()
+
+    # Restrict the data that parsing stores
+    def project(self, keep_types=None, keep_attributes=None):
+        """
+        Sets the projection applied by the following parses. Entries of other
+        message types are only counted (in skipped); _START/_END entries are
+        always kept. Other attributes are not decoded. 'parent_' prefixes
+        are ignored in keep_attributes, so 'parent_Interface' keeps 'Interface'.
+
+        Parameters:
+        -----------
+        keep_types : iterable, optional
+            The message types to store, or None for all.
+        keep_attributes : iterable, optional
+            The attribute names to store, or None for all.
+        """
+        self.keep_types = None if keep_types is None else set(keep_types)
+        self.keep_attributes = None if keep_attributes is None else {_base_attribute(key) for key in keep_attributes}
+
+    # Parser options passed on to worker processes
+    def settings(self):
+        return {'lazy': self.lazy, 'keep_types': self.keep_types, 'keep_attributes': self.keep_attributes, 'log_format': self.log_format}
+
+    # Check whether a query can be answered from the stored data
+    def covers(self, types, keys=()):
+        """
+        Returns whether the projection kept everything a query on the given types
+        and attributes needs.
+
+        Parameters:
+        -----------
+        types : list or str
+            The queried message types, or 'all'.
+        keys : iterable, optional
+            The queried attribute names (None entries are ignored), or None when
+            every attribute is needed.
+
+        Returns:
+        --------
+        bool
+            False if a queried type or attribute was left out.
+        """
+        if types == 'all':
+            if self.skipped:
+                return False
+        elif any(message_type in self.skipped for message_type in types):
+            return False
+        if self.keep_attributes is not None:
+            if keys is None:
+                return False
+            return all(_base_attribute(key) in self.keep_attributes for key in keys if key)
+        return True
+
+    # Span table of the _START/_END hierarchy
+    @property
+    def spans(self):
+        if self._spans is None or self._spans.count != self.count:
+            self._spans = SpanTable(self)
+        return self._spans
+
+    # Count the entries of every message type
+    @property
+    def types(self):
+        """
+        Message type -> number of entries in the log, including the types left out
+        by the projection (for completers and type lists).
+        """
+        counts = {message_type: len(table) for message_type, table in self.lookup.items()}
+        for message_type, count in self.skipped.items():
+            counts[message_type] = counts.get(message_type, 0) + count
+        return counts
+
+    # Clear all parsed data
+    def reset(self):
+        """
+        Resets the dataset to its empty state.
+        """
+        self.lookup = {}  # Dictionary for storing tables based on message type
+        self.MIN = 0  # Minimum timestamp
+        self.MAX = 0  # Maximum timestamp
+        self.times=None
+        self.count = 0
+        self.type_names = []
+        self.seq_types = np.empty(0, dtype=np.int32)
+        self.seq_rows = np.empty(0, dtype=np.int64)
+        self._type_ids = {}  # Message type -> type id
+        self._builders = {}  # Message type -> _TableBuilder with rows not yet in lookup
+        self._pending_types = []  # seq_types/seq_rows of rows not yet finalized
+        self._pending_rows = []
+        self._schema = {}  # Message type -> {key: value converter}, see _parse_attributes
+        self.offset = 0  # Bytes of the log file parsed so far, see update
+        self.open_spans = []  # Seqs of the _START entries not yet closed by an _END
+        self.skipped = {}  # Message type -> entries left out by the projection
+        self.line_offsets = np.zeros(1, dtype=np.int64)  # Line starts, see raw_line
+        self.seq_lines = np.empty(0, dtype=np.int64)
+        self.sources = []
+        self._pending_lines = []  # line_offsets and line positions of entries not yet finalized
+        self._pending_positions = []
+        self._spans = None  # SpanTable, see spans
+        self._index_map = None  # Memory map of the index sidecar the arrays were loaded from, see load_index
+        self.generation = next(_generations)
+
+    # Parse log lines and populate the dataset
+    def parse(self, lines, path=None):
+        """
+        Parses log lines and creates nodes for each log entry, storing them
+        in the dataset. Manages the hierarchy of nodes based on message type
+        (e.g., _START and _END markers).
+
+        Parameters:
+        -----------
+        lines : iterable
+            Any iterable of log lines (an open file object, a generator, or a list).
+            Lines are consumed one at a time, so a file object is parsed in
+            constant extra memory. Spans left open by an earlier call stay open,
+            so a log can be fed in several parts. Line offsets are counted in
+            UTF-8 bytes, so a file should be opened with newline=''. Lines of the
+            default format are split as text; those of other formats are encoded
+            and handed to the scan function of the format. A last line without a
+            newline is left for update.
+        path : str, optional
+            The file the lines are read from, for raw_line. Without it the lines
+            continue the last file of the dataset.
+        """
+        if path is not None or not self.sources:
+            self._add_source(path)
+        parent_stack = self.open_spans  # Stack of seqs of the open _START entries
+        start = position = checkpoint = int(self.line_offsets[-1])
+        total = os.path.getsize(path) if path is not None else None
+        as_text = self.scan is _scan_records
+        line_ends = []
+        for line in _complete_lines(lines):
+            line_start = position
+            position += len(line) if line.isascii() else len(line.encode('utf-8'))
+            line_ends.append(position)
+            if position >= checkpoint:
+                self._report(position - start, total)
+                checkpoint = position + PROGRESS_BYTES
+            if not as_text:
+                data = line.encode('utf-8')
+                for _, timestamp, message_type, attributes_str in self.scan(data, 0, len(data)):
+                    self._add_node(line_start, timestamp, message_type, attributes_str, parent_stack)
+                continue
+            if '\t' not in line:  # Skip lines without tabs
+                continue
+
+            parts = line.split('\t')
+            pre_message_parts = parts[0].split()
+            if not pre_message_parts:
+                continue
+            timestamp = pre_message_parts[0][:-1]  # Extract timestamp
+
+            # Message type is everything before '(', attributes sit between '(' and the last ')'
+            message = parts[1]
+            open_paren = message.find('(')
+            if open_paren < 0:
+                message_type, attributes_str = message.strip(), ''
+            else:
+                close_paren = message.rfind(')')
+                message_type = message[:open_paren].strip()
+                attributes_str = message[open_paren + 1:close_paren if close_paren > open_paren else len(message)]
+
+            self._add_node(line_start, timestamp, message_type, attributes_str, parent_stack)
+        self._report(position - start, total)
+        self._pending_lines.append(np.array(line_ends, dtype=np.int64))
+        self.offset += position - start
+        self._finalize()
+
+    # Parse a log file through a read-only memory map, working on bytes
+    def parse_mmap(self, path):
+        """
+        Parses a log file by memory-mapping it and scanning the raw bytes for the
+        tab, '(' and closing ')' of each line (see _scan_records). Only the timestamp,
+        the message type and the attribute slice are decoded. Produces the same
+        dataset as parse(). Only complete lines are parsed; a last line that is
+        still being written is left for update.
+
+        Parameters:
+        -----------
+        path : str
+            The file path of the log file to parse.
+        """
+        base = self._add_source(path)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return  # mmap cannot map an empty file
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                complete = buf.rfind(b'\n') + 1  # Just past the last complete line
+                for start, end in _line_ranges(buf, 0, complete, PROGRESS_BYTES):
+                    self._report(start, len(buf))
+                    for position, timestamp, message_type, attributes_str in self.scan(buf, start, end):
+                        self._add_node(base + position, timestamp, message_type, attributes_str, self.open_spans)
+                self._report(len(buf), len(buf))
+                self._pending_lines.append(_line_ends(buf, 0, complete) + base)
+                self.offset = complete
+        self._finalize()
+
+    # Parse a binary stream of log text block by block
+    def parse_stream(self, stream, block_size=1024 * 1024, path=None):
+        """
+        Parses a binary stream (e.g. a decompressing reader from open_log) by
+        reading it in blocks and scanning the complete lines of each block as bytes
+        (see _scan_records). Produces the same dataset as parse_mmap() without
+        needing the log as a file on disk.
+
+        Parameters:
+        -----------
+        stream : binary file object
+            The stream to read the log text from.
+        block_size : int, optional
+            The number of bytes read at a time (default is 1 MiB).
+        path : str, optional
+            The file the stream reads (through open_log), for raw_line and for
+            the total of the progress reports.
+        """
+        base = self._add_source(path)
+        raw = getattr(stream, 'raw', stream)
+        total = os.path.getsize(path) if path is not None else None
+        for block in _line_blocks(stream, block_size):
+            self._report(raw.compressed_tell() if isinstance(raw, CompressedLog) else self.offset, total)
+            for position, timestamp, message_type, attributes_str in self.scan(block, 0, len(block)):
+                self._add_node(base + position, timestamp, message_type, attributes_str, self.open_spans)
+            self._pending_lines.append(_line_ends(block, 0, len(block)) + base)
+            base += len(block)
+            self.offset += len(block)
+        self._finalize()
+
+    # Parse the lines appended to a log file since it was last parsed
+    def update(self, path):
+        """
+        Parses only the bytes appended to a log file since the previous parse or
+        update, continuing the hierarchy from the spans that were still open, and
+        extends the tables and MAX in place. Only complete lines are consumed; a
+        line that is still being written is picked up by the next call.
+
+        Parameters:
+        -----------
+        path : str
+            The file path of the log file that was parsed into the dataset.
+
+        Returns:
+        --------
+        int or None
+            The number of new entries, or None if the file is now shorter than the
+            parsed part (truncated or replaced) and has to be parsed again.
+            Compressed logs are archives and are not followed (always 0).
+        """
+        if detect_compression(path) is not None:
+            return 0
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < self.offset:
+                return None
+            if size == self.offset:
+                return 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                end = buf.rfind(b'\n', self.offset) + 1
+                if end <= self.offset:
+                    return 0  # No complete line yet
+                count = self.count
+                base = self.sources[-1][1] if self.sources else 0
+                for position, timestamp, message_type, attributes_str in self.scan(buf, self.offset, end):
+                    self._add_node(base + position, timestamp, message_type, attributes_str, self.open_spans)
+                self._pending_lines.append(_line_ends(buf, self.offset, end) + base)
+                self.offset = end
+        self._finalize()
+        return self.count - count
+
+    # Parse a log file with a pool of worker processes
+    def parse_parallel(self, path, workers=None):
+        """
+        Parses a log file in parallel. The file is split into line-aligned byte
+        ranges that are parsed by a process pool (see _parse_chunk); the results are
+        then stitched together in file order, carrying the stack of open _START spans
+        from one chunk into the next, so the dataset is identical to parse_mmap().
+        As there, a last line that is still being written is left for update.
+
+        Parameters:
+        -----------
+        path : str
+            The file path of the log file to parse.
+        workers : int, optional
+            Number of worker processes (default is the CPU count).
+        """
+        workers = workers or os.cpu_count() or 1
+        base = self._add_source(path)
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return  # mmap cannot map an empty file
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                ranges = _chunk_ranges(buf, workers * 4)  # Several chunks per worker to balance the load
+                complete = buf.rfind(b'\n') + 1  # Just past the last complete line
+        if ranges and ranges[-1][1] > complete:  # Only the last range can end in an incomplete line
+            start = ranges.pop()[0]
+            if complete > start:
+                ranges.append((start, complete))
+        parent_stack = self.open_spans  # Open spans carried across chunk boundaries
+        total = ranges[-1][1] if ranges else 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_parse_chunk, path, start, end, self.settings()) for start, end in ranges]
+            done = 0
+            for future, (_, end) in zip(futures, ranges):
+                records, closed, still_open, skipped, line_ends = self._result(futures, future, done, total)
+                parent_stack = self._stitch_chunk(records, closed, still_open, parent_stack, base)
+                self._count_skipped(skipped)
+                self._pending_lines.append(line_ends + base)
+                done = end
+            self._report(done, total)
+        self.open_spans = parent_stack
+        self.offset = ranges[-1][1] if ranges else 0
+        self._finalize()
+
+    # Parse several log files into one dataset ordered by timestamp
+    def parse_files(self, paths, workers=None):
+        """
+        Parses several log files (e.g. the parts trace.0, trace.1, ... of a rotated
+        log, plain or compressed) into one dataset. Each file is parsed by its own
+        worker process (see _parse_file); the entries are then merged by timestamp
+        (k-way, keeping the file order of entries with equal timestamps, earlier
+        files first) and the _START/_END hierarchy is built over the merged stream,
+        so spans that were split by the rotation are joined again. The files are
+        never concatenated on disk.
+
+        Parameters:
+        -----------
+        paths : list
+            The file paths of the log files.
+        workers : int, optional
+            Number of worker processes (default is the CPU count, at most one per file).
+        """
+        workers = min(len(paths), workers or os.cpu_count() or 1)
+        sizes = [os.path.getsize(path) for path in paths]
+        total, parts = sum(sizes), []
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_parse_file, path, self.settings()) for path in paths]
+                for future in futures:
+                    parts.append(self._result(futures, future, sum(sizes[:len(parts)]), total))
+        else:
+            for path in paths:
+                self._report(sum(sizes[:len(parts)]), total)
+                parts.append(_parse_file(path, self.settings()))
+        self._report(total, total)
+        streams = []
+        for path, (records, skipped, line_ends) in zip(paths, parts):
+            self._count_skipped(skipped)
+            base = self._add_source(path)
+            self._pending_lines.append(line_ends + base)
+            streams.append(_shifted(records, base))
+        for _, position, timestamp, message_type, attributes in heapq.merge(*streams, key=operator.itemgetter(0)):
+            self._add_parsed_node(position, timestamp, message_type, attributes, self.open_spans)
+        self._finalize()
+
+    # Wait for the result of a worker process, watching the cancel token
+    def _result(self, futures, future, done, total):
+        """
+        Returns future.result(), calling _report(done, total) every
+        PROGRESS_INTERVAL while waiting. On cancellation the futures that have not
+        started yet are cancelled before ParseCancelled is raised.
+        """
+        while True:
+            try:
+                self._report(done, total)
+            except ParseCancelled:
+                for pending in futures:
+                    pending.cancel()
+                raise
+            try:
+                return future.result(timeout=PROGRESS_INTERVAL)
+            except FutureTimeoutError:
+                pass
+
+    # Attach the records of one parsed chunk to the dataset
+    def _stitch_chunk(self, records, closed, still_open, parent_stack, base=0):
+        """
+        Stores the entries of a chunk parsed by _parse_chunk, resolving parent links
+        that point outside the chunk against the carried parent stack.
+
+        Parameters:
+        -----------
+        records : list
+            The (position, timestamp, message_type, attributes, parent) records of the chunk.
+        closed : int
+            Number of carried spans closed inside the chunk.
+        still_open : list
+            Indices of records whose spans are still open at the end of the chunk.
+        parent_stack : list
+            The seqs of the spans open before the chunk.
+        base : int, optional
+            The first offset of the file in line_offsets.
+
+        Returns:
+        --------
+        list
+            The seqs of the spans open after the chunk.
+        """
+        seqs = []
+        for position, timestamp, message_type, attributes, parent in records:
+            if parent < 0:
+                depth = len(parent_stack) + parent  # parent == -(closed so far + 1)
+                parent = parent_stack[depth] if depth >= 0 else -1
+            else:
+                parent = seqs[parent]
+            seqs.append(self._append_node(base + position, timestamp, message_type, attributes, parent))
+        return parent_stack[:max(0, len(parent_stack) - closed)] + [seqs[i] for i in still_open]
+
+    # Store one parsed entry and track the START/END hierarchy
+    def _add_node(self, position, timestamp, message_type, attributes_str, parent_stack):
+        """
+        Stores a single log entry and updates the parent stack for
+        _START/_END markers. Shared by the serial parse engines.
+
+        Parameters:
+        -----------
+        position : int
+            The offset of the line of the entry, in line_offsets coordinates.
+        timestamp : str
+            The timestamp of the entry.
+        message_type : str
+            The message type of the entry.
+        attributes_str : str
+            The raw attributes string found between the parentheses.
+        parent_stack : list
+            The seqs of the currently open _START entries; updated in place.
+        """
+        if self._skip(message_type):
+            return
+        attributes = attributes_str if self.lazy else self._parse_attributes(attributes_str, message_type)
+        self._add_parsed_node(position, timestamp, message_type, attributes, parent_stack)
+
+    # Report the progress of a parse and stop it if it was cancelled
+    def _report(self, done, total):
+        """
+        Called by the parse methods about every PROGRESS_BYTES of input. Raises
+        ParseCancelled if the cancel token is set and passes (done, total) to the
+        progress callback unless it was called less than PROGRESS_INTERVAL ago.
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise ParseCancelled()
+        if self.progress is not None:
+            now = time.monotonic()
+            if now >= self._next_report or (total is not None and done >= total):
+                self._next_report = now + PROGRESS_INTERVAL
+                self.progress(done, total)
+
+    # Register a file whose lines are added to the line index
+    def _add_source(self, path):
+        """
+        Appends a file to sources and returns its first offset in line_offsets
+        coordinates, just past the lines indexed so far.
+        """
+        ends = [line_ends for line_ends in self._pending_lines if len(line_ends)]
+        base = int(ends[-1][-1]) if ends else int(self.line_offsets[-1])
+        first_line = len(self.line_offsets) - 1 + sum(len(line_ends) for line_ends in ends)
+        self.sources.append([path, base, first_line])
+        return base
+
+    # Check whether the projection leaves out entries of a message type
+    def _skip(self, message_type):
+        """
+        Returns True (and counts the entry in skipped) if entries of the message
+        type are not kept. _START and _END entries are always kept because they
+        delimit the spans (see SpanTable) and carry the parent attributes of the
+        entries inside them.
+        """
+        if self.keep_types is None or message_type in self.keep_types or message_type.endswith(("_START", "_END")):
+            return False
+        self.skipped[message_type] = self.skipped.get(message_type, 0) + 1
+        return True
+
+    # Add the skipped entry counts reported by a worker
+    def _count_skipped(self, skipped):
+        for message_type, count in skipped.items():
+            self.skipped[message_type] = self.skipped.get(message_type, 0) + count
+
+    # Store one entry with parsed attributes and track the START/END hierarchy
+    def _add_parsed_node(self, position, timestamp, message_type, attributes, parent_stack):
+        """
+        Same as _add_node for an entry whose attributes are already parsed (or
+        kept raw, for a lazy dataset).
+        """
+        seq = self._append_node(position, timestamp, message_type, attributes, parent_stack[-1] if parent_stack else -1)
+
+        # Track start and end of node hierarchy
+        if message_type.endswith("_START"):
+            parent_stack.append(seq)
+        elif message_type.endswith("_END") and parent_stack:
+            parent_stack.pop()
+
+    # Store an entry under its message type
+    def _append_node(self, position, timestamp, message_type, attributes, parent):
+        """
+        Stores an entry with already parsed attributes in the builder of its
+        message type. The entry becomes visible in the lookup after _finalize().
+
+        Parameters:
+        -----------
+        position : int
+            The offset of the line of the entry, in line_offsets coordinates.
+        timestamp : str
+            The timestamp of the entry.
+        message_type : str
+            The message type of the entry.
+        attributes : dict or str
+            The parsed attributes of the entry, or its raw attribute string if the
+            dataset is lazy.
+        parent : int
+            The seq of the enclosing _START entry, or -1.
+
+        Returns:
+        --------
+        int
+            The seq of the new entry.
+        """
+        seq = self.count
+        self.count += 1
+        builder = self._builders.get(message_type)
+        if builder is None:
+            builder = self._builders[message_type] = _TableBuilder(self.lazy)
+            if message_type not in self._type_ids:
+                self._type_ids[message_type] = len(self.type_names)
+                self.type_names.append(message_type)
+        table = self.lookup.get(message_type)
+        self._pending_types.append(self._type_ids[message_type])
+        self._pending_rows.append(len(builder.seqs) + (len(table) if table is not None else 0))
+        self._pending_positions.append(position)
+        builder.append(timestamp, seq, parent, attributes)
+        return seq
+
+    # Move the collected rows into the columnar tables
+    def _finalize(self):
+        """
+        Converts the rows collected since the last call into typed columns,
+        appends them to the tables in the lookup, extends the line index and
+        updates MIN/MAX.
+        """
+        self.line_offsets = np.concatenate([self.line_offsets] + self._pending_lines)
+        positions = np.array(self._pending_positions, dtype=np.int64)
+        self.seq_lines = np.concatenate((self.seq_lines, np.searchsorted(self.line_offsets, positions, side='right') - 1))
+        self._pending_lines, self._pending_positions = [], []
+        self.seq_types = np.concatenate((self.seq_types, np.array(self._pending_types, dtype=np.int32)))
+        self.seq_rows = np.concatenate((self.seq_rows, np.array(self._pending_rows, dtype=np.int64)))
+        self._pending_types, self._pending_rows = [], []
+        for message_type, builder in self._builders.items():
+            table = self.lookup.get(message_type)
+            if table is None:
+                table = self.lookup[message_type] = MYTABLE(message_type, self)
+            table.extend(builder)
+        self._builders = {}
+        self.generation = next(_generations)
+        bounds = [(table.timestamps[0], table.timestamps[np.searchsorted(table.timestamps, np.inf, side='right') - 1])
+                  for table in self.lookup.values() if len(table) and not np.isnan(table.timestamps[0])]
+        if bounds:
+            self.MIN = float(min(first for first, _ in bounds))  # Minimum timestamp
+            self.MAX = float(max(last for _, last in bounds))  # Maximum timestamp
+
+    # Build a node object for one entry
+    def node(self, seq):
+        """
+        Builds a MYNODE (with its chain of parent nodes) for the entry with the given seq.
+
+        Parameters:
+        -----------
+        seq : int
+            The global entry number.
+
+        Returns:
+        --------
+        MYNODE
+            The node of the entry.
+        """
+        table = self.lookup[self.type_names[self.seq_types[seq]]]
+        row = self.seq_rows[seq]
+        parent_seq = table.parents[row]
+        parent = self.node(parent_seq) if parent_seq >= 0 else None
+        current_node = MYNODE(table.name, _py(table.timestamps[row]), parent)
+        current_node.set_attributes(**table.row_attributes(row))
+        return current_node
+
+    # Find the file a line index belongs to
+    def _source_of(self, line):
+        return bisect.bisect_right([source[2] for source in self.sources], line) - 1
+
+    # Line number of an entry in its file
+    def line_number(self, seq):
+        """
+        Returns the line number (starting at 1) of an entry within its log file.
+
+        Parameters:
+        -----------
+        seq : int
+            The global entry number.
+
+        Returns:
+        --------
+        int
+            The line number in the file the entry was parsed from (see sources).
+        """
+        line = int(self.seq_lines[seq])
+        return line - self.sources[self._source_of(line)][2] + 1
+
+    # Read the log line of an entry
+    def raw_line(self, seq):
+        """
+        Returns the original text of the line an entry was parsed from, read from
+        the log through the line index (one seek, no scanning).
+
+        Parameters:
+        -----------
+        seq : int
+            The global entry number.
+
+        Returns:
+        --------
+        str
+            The line without its line break.
+        """
+        line = int(self.seq_lines[seq])
+        source = self._source_of(line)
+        return self.read_lines(line - self.sources[source][2] + 1, 1, source)[0]
+
+    # Read lines of a log file by line number
+    def read_lines(self, line_number, count=1, source=0):
+        """
+        Reads consecutive lines of a parsed log file, seeking straight to the first
+        one with line_offsets. Compressed logs are read through open_log.
+
+        Parameters:
+        -----------
+        line_number : int
+            The number (starting at 1) of the first line in the file.
+        count : int, optional
+            The number of lines to read (default is 1).
+        source : int, optional
+            The index of the file in sources (default is the first file).
+
+        Returns:
+        --------
+        list
+            The lines as str without line breaks. Fewer than count lines are
+            returned at the end of the file.
+        """
+        path, base, first_line = self.sources[source]
+        last_line = self.sources[source + 1][2] if source + 1 < len(self.sources) else len(self.line_offsets) - 1
+        start = max(first_line + line_number - 1, first_line)
+        stop = min(start + count, last_line)
+        if path is None or start >= stop:
+            return []
+        with open_log(path) as stream:
+            stream.seek(int(self.line_offsets[start]) - base)
+            data = stream.read(int(self.line_offsets[stop] - self.line_offsets[start]))
+        return [line.rstrip('\r') for line in data.decode('utf-8', 'replace').split('\n')[:stop - start]]
+
+    # Build the rollups of the numeric attributes
+    def build_rollups(self, types=None):
+        """
+        Builds the Rollup of every numeric attribute (and the entry count) of the
+        given message types, so save_index stores them with the dataset.
+
+        Parameters:
+        -----------
+        types : iterable, optional
+            The message types (default is all).
+
+        Returns:
+        --------
+        int
+            The number of rollups that were not built yet.
+        """
+        built = 0
+        for message_type, table in self.lookup.items():
+            if types is not None and message_type not in types:
+                continue
+            table._check_indexes()
+            for key in [None] + [key for key, column in table.columns.items() if column.dtype.kind in 'iuf']:
+                if key not in table._rollups:
+                    table.rollup(key)
+                    built += 1
+        return built
+
+    # Write the parsed dataset to an index sidecar
+    def save_index(self, index_path, fingerprint):
+        """
+        Writes the tables, the entry hierarchy, the line index, the rollups built so far and MIN/MAX to an index file so a
+        later run can load them with load_index instead of parsing the log again.
+        The file holds a JSON header (metadata, fingerprint and string columns)
+        followed by the numeric arrays as raw bytes, which load_index maps without
+        copying. The raw attributes of tables that have not been decoded yet are
+        stored the same way, as UTF-8 bytes plus row offsets (see _RawText). The
+        file is written under a temporary name and renamed, so an interrupted
+        write never leaves a truncated index behind; arrays still mapped from the
+        index being replaced are copied first (see _release_index).
+
+        Parameters:
+        -----------
+        index_path : str
+            The file path of the index (usually the log path + INDEX_SUFFIX).
+        fingerprint : list
+            The _fingerprint of the log the dataset was parsed from.
+        """
+        arrays, tables, offset = [], [], 0
 
-        Returns:
-        --------
-        list
-            A list of parent nodes in reverse order (from root to the current node).
+        def add_array(array):
+            nonlocal offset
+            array = np.ascontiguousarray(array)
+            offset += -offset % INDEX_ALIGN
+            arrays.append((offset, array))
+            entry = [array.dtype.str, len(array), offset]
+            offset += array.nbytes
+            return entry
+
+        def add_raw(raw):
+            if not isinstance(raw, _RawText):
+                raw = _RawText.encode(raw)
+            return [add_array(raw.offsets), add_array(raw.data)]
+
+        for table in self.lookup.values():
+            numeric, objects = {}, {}
+            for key, column in table._columns.items():
+                if column.dtype == object:
+                    objects[key] = column.tolist()
+                else:
+                    numeric[key] = add_array(column)
+            table._check_indexes()
+            rollups = [[key, rollup.base, [[add_array(array) for array in level] for level in rollup.levels]]
+                       for key, rollup in table._rollups.items() if rollup is not None]
+            tables.append({'name': table.name,
+                           'rollups': rollups,
+                           'timestamps': add_array(table.timestamps),
+                           'seqs': add_array(table.seqs),
+                           'parents': add_array(table.parents),
+                           'columns': numeric,
+                           'objects': objects,
+                           'order': list(table._columns),
+                           'raw': None if table._raw is None else add_raw(table._raw)})
+        header = json.dumps({'version': INDEX_VERSION,
+                             'fingerprint': fingerprint,
+                             'log_format': self.log_format,
+                             'MIN': self.MIN,
+                             'MAX': self.MAX,
+                             'count': self.count,
+                             'offset': self.offset,
+                             'open_spans': self.open_spans,
+                             'type_names': self.type_names,
+                             'seq_types': add_array(self.seq_types),
+                             'seq_rows': add_array(self.seq_rows),
+                             'seq_lines': add_array(self.seq_lines),
+                             'line_offsets': add_array(self.line_offsets),
+                             'tables': tables}, default=_py).encode('utf-8')
+        data_start = len(INDEX_MAGIC) + 8 + len(header)
+        data_start += -data_start % INDEX_ALIGN
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(INDEX_MAGIC + struct.pack('<Q', len(header)) + header)
+            for array_offset, array in arrays:
+                file.seek(data_start + array_offset)
+                file.write(array.tobytes())
+        self._release_index()  # A mapped file cannot be replaced on Windows
+        try:
+            os.replace(temp_path, index_path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    # Copy the arrays mapped from the index sidecar into memory
+    def _release_index(self):
         """
-        node, parents = self, []
-        while node.parent:
-            parents.append(node.parent)
-            node = node.parent
-        return parents[::-1]
+        Replaces every array of the dataset that is a view of the memory-mapped
+        index (see load_index) by a copy and closes the mapping, unless other
+        views of it (e.g. cached query results) are still alive; it is then
+        closed once they are gone.
+        """
+        buf, self._index_map = self._index_map, None
+        if buf is None:
+            return
 
-# MYDS class represents the dataset and parsing logic
-class MYDS:
-    """
-    MYDS class represents the dataset of nodes parsed from a log file. It includes
-    methods to parse the log lines, manage node hierarchy, and store the nodes.
+        def own(array):
+            base = array
+            while isinstance(base, np.ndarray):
+                base = base.base
+            return array.copy() if isinstance(base, memoryview) and base.obj is buf else array
 
-    Attributes:
-    -----------
-    lookup : dict
-        A dictionary storing nodes categorized by message type.
-    MIN : str
-        The minimum timestamp in the dataset.
-    MAX : str
-        The maximum timestamp in the dataset.
-    """
-    def __init__(self):
+        for table in self.lookup.values():
+            table.timestamps, table.seqs, table.parents = own(table.timestamps), own(table.seqs), own(table.parents)
+            table._columns = {key: own(column) for key, column in table._columns.items()}
+            if isinstance(table._raw, _RawText):
+                table._raw = _RawText(own(table._raw.offsets), own(table._raw.data))
+            for key, rollup in table._rollups.items():
+                if rollup is not None:
+                    rollup.levels = [tuple(own(array) for array in level) for level in rollup.levels]
+        self.seq_types, self.seq_rows, self.seq_lines = own(self.seq_types), own(self.seq_rows), own(self.seq_lines)
+        self.line_offsets = own(self.line_offsets)
+        self._spans = None
+        try:
+            buf.close()
+        except BufferError:
+            pass  # Still viewed elsewhere
+
+    # Load the dataset from an index sidecar
+    def load_index(self, index_path, fingerprint):
         """
-        Initializes the MYDS dataset with an empty lookup dictionary and default
-        minimum and maximum timestamps.
+        Loads a dataset written by save_index. The index file is memory-mapped
+        read-only and the numeric arrays (and the raw attribute text, see
+        _RawText) are views of the mapping, so loading costs little more than
+        reading the header; every array entry is checked against the size of
+        the file first. Nothing is loaded if the index is missing, truncated or
+        corrupt, was written by another index version or for another log
+        format, or belongs to a different state of the log.
+        sources is not stored (the log may have moved with its index) and is
+        left for the caller to set.
+
+        Parameters:
+        -----------
+        index_path : str
+            The file path of the index.
+        fingerprint : list
+            The current _fingerprint of the log.
+
+        Returns:
+        --------
+        bool
+            True if the dataset was loaded, False if the index is missing or stale.
         """
-        self.lookup = {}  # Dictionary for storing nodes based on message type
-        self.MIN = 0  # Minimum timestamp
-        self.MAX = 0  # Maximum timestamp
-        self.times=None
+        try:
+            with open(index_path, "rb") as file:
+                buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return False
+        try:
+            self._restore_index(buf, fingerprint)
+            self._index_map = buf
+            return True
+        except (ValueError, TypeError, KeyError, IndexError, struct.error):
+            pass  # Stale or corrupt index, the log is parsed again
+        self.reset()
+        try:
+            buf.close()
+        except BufferError:
+            pass  # Closed once the last view is gone
+        return False
 
-    # Parse log lines and populate the dataset
-    def parse(self, lines):
+    # Restore the dataset from the bytes of an index sidecar
+    def _restore_index(self, buf, fingerprint):
         """
-        Parses log lines and creates nodes for each log entry, storing them
-        in the dataset. Manages the hierarchy of nodes based on message type
-        (e.g., _START and _END markers).
+        Restores the dataset from the content of an index file (see load_index).
+        Every array entry is checked against the size of the file before it is
+        viewed.
 
         Parameters:
         -----------
-        lines : list
-            A list of log lines to be parsed.
+        buf : mmap.mmap or bytes
+            The content of the index file.
+        fingerprint : list
+            The current _fingerprint of the log.
+
+        Raises:
+        -------
+        ValueError
+            If the index is truncated, corrupt or stale.
         """
-        parent_stack = []  # Stack to track parent nodes
-        start = 0
-        for line in lines:
-            if '\t' not in line:  # Skip lines without tabs
-                continue
+        if buf[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError("Not an index file")
+        header_size, = struct.unpack_from('<Q', buf, len(INDEX_MAGIC))
+        data_start = len(INDEX_MAGIC) + 8 + header_size
+        header = json.loads(buf[len(INDEX_MAGIC) + 8:data_start].decode('utf-8'))
+        if header.get('version') != INDEX_VERSION or header.get('fingerprint') != fingerprint or header.get('log_format') != self.log_format:
+            raise ValueError("Index written for another version, format or state of the log")
+        data_start += -data_start % INDEX_ALIGN
 
-            parts = line.split('\t')
-            pre_message_parts = parts[0].split()
-            timestamp = pre_message_parts[0][:-1]  # Extract timestamp
-            if start == 0:
-                self.MIN = timestamp  # Set MIN timestamp on first iteration
-                start = 1
-            message_type = parts[1].split('(')[0].strip()  # Extract message type
-
-            # Extract attributes from the message part
-            attributes_str = parts[1].split('(', 1)[1][:-1] if '(' in parts[1] else ''
-            message_name = message_type
-
-            # Create a new node and set its attributes
-            key = message_type
-            current_node = MYNODE(message_name, timestamp, parent_stack[-1] if parent_stack else None)
-            current_node.set_attributes(**self._parse_attributes(attributes_str))
-
-            if key not in self.lookup:
-                self.lookup[key] = []
-            self.lookup[key].append((timestamp, current_node))
-
-            # Track start and end of node hierarchy
-            if message_type.endswith("_START"):
-                parent_stack.append(current_node)
-            elif message_type.endswith("_END") and parent_stack:
-                parent_stack.pop()
-        self.MAX = timestamp  # Set MAX timestamp
+        def get_array(entry):
+            dtype, length, offset = entry
+            dtype = np.dtype(dtype)
+            if not isinstance(length, int) or not isinstance(offset, int) or length < 0 or offset < 0 or dtype.hasobject:
+                raise ValueError(f"Invalid array entry {entry}")
+            if length == 0:
+                return np.empty(0, dtype=dtype)
+            if data_start + offset + length * dtype.itemsize > len(buf):
+                raise ValueError("Index file is truncated")
+            return np.frombuffer(buf, dtype=dtype, count=length, offset=data_start + offset)
+
+        self.reset()
+        for stored in header['tables']:
+            table = MYTABLE(stored['name'], self)
+            table.timestamps = get_array(stored['timestamps'])
+            table.seqs = get_array(stored['seqs'])
+            table.parents = get_array(stored['parents'])
+            for key in stored['order']:
+                if key in stored['columns']:
+                    table.columns[key] = get_array(stored['columns'][key])
+                else:
+                    table.columns[key] = column = np.empty(len(table), dtype=object)
+                    column[:] = stored['objects'][key]
+            if stored['raw'] is not None:  # Table not decoded yet
+                offsets, data = (get_array(entry) for entry in stored['raw'])
+                if len(offsets) != len(table) + 1 or offsets[0] != 0 or offsets[-1] != len(data) or (np.diff(offsets) < 0).any():
+                    raise ValueError("Invalid raw attribute offsets")
+                table._raw = _RawText(offsets, data)
+            for key, base, levels in stored['rollups']:
+                table._rollups[key] = Rollup(base, [tuple(get_array(entry) for entry in level) for level in levels])
+            table._indexed = header['count']
+            self.lookup[table.name] = table
+        self.type_names = header['type_names']
+        self._type_ids = {message_type: type_id for type_id, message_type in enumerate(self.type_names)}
+        self.seq_types = get_array(header['seq_types'])
+        self.seq_rows = get_array(header['seq_rows'])
+        self.seq_lines = get_array(header['seq_lines'])
+        self.line_offsets = get_array(header['line_offsets'])
+        self.count = header['count']
+        self.offset = header['offset']
+        self.open_spans = header['open_spans']
+        self.MIN, self.MAX = header['MIN'], header['MAX']
 
     # Helper function to parse attributes from a string
-    def _parse_attributes(self, attributes_str):
+    def _parse_attributes(self, attributes_str, message_type=None):
         """
         Helper function to parse the attributes string and convert it into a dictionary.
+        Values are converted through the schema cache: once a (message type, key)
+        column has been seen, its value kind is remembered and later values are
+        converted directly, falling back to the full hex/int/float/str probing of
+        _coerce_value only when a value does not fit.
 
         Parameters:
         -----------
         attributes_str : str
             The raw attributes string extracted from the log entry.
+        message_type : str, optional
+            The message type of the entry, used to key the schema cache.
 
         Returns:
         --------
@@ -192,87 +2692,634 @@ class MYDS:
             A dictionary of parsed attribute key-value pairs.
         """
         attributes = {}
+        schema = self._schema.get(message_type)
+        if schema is None:
+            schema = self._schema[message_type] = {}
+        keep = self.keep_attributes
         for attr in attributes_str.split(','):
-            if ':' in attr:
-                key, value = attr.split(':', 1)
-                key = key.strip()
-                value = value.strip()
+            key, sep, value = attr.partition(':')
+            if not sep:
+                continue
+            key = key.strip()
+            if keep is not None and key not in keep:
+                continue  # Left out by the projection
+            value = value.strip()
+            coerce = schema.get(key)
+            if coerce is not None:
                 try:
-                    if value.startswith('0x'):
-                        attributes[key] = int(value, 16)  # Parse hex value
-                    else:
-                        attributes[key] = int(value)  # Parse integer
+                    attributes[key] = coerce(value)  # Fast path for the learned kind
+                    continue
                 except ValueError:
-                    try:
-                        attributes[key] = float(value)  # Parse float
-                    except ValueError:
-                        attributes[key] = value  # Store as string if parsing fails
+                    pass  # Value does not fit the learned kind
+            attributes[key] = parsed = _coerce_value(value)
+            schema[key] = _coercer_for(value, parsed)
         return attributes
 
-# Function to parse plot commands from strings
-def parse_command(command):
+# Plot command: message types, axes, time range, filters and parent filter
+PLOT_COMMAND = re.compile(r"Plot (all|[\w,]+) x=(\w+|default) y=(\w+)(?: from=(\S+) to=(\S+))?(?: __att\[(\w+)\]=(\w+))*(?: p__att\[(\w+)\]=(\w+))?")
+
+# __att[key]=value filters of a command; PLOT_COMMAND only captures the last one
+ATTRIBUTE_FILTER = re.compile(r"(?<= )__att\[(\w+)\]=(\w+)")
+WHERE_CLAUSE = re.compile(r"\swhere\s+(.*)$", re.IGNORECASE)
+
+# Compare a column with a filter value given as text
+def _matches(column, value):
     """
-    Parses a plot command string and extracts the plotting parameters.
+    Returns a boolean mask of the column entries equal to a filter value. The
+    value is converted once, like an attribute value (_coerce_value), and compared
+    with the typed column, so numeric columns are never turned into strings.
 
     Parameters:
     -----------
-    command : str
-        The plot command string to be parsed.
+    column : numpy.ndarray
+        The column (numeric, or object for strings and mixed values).
+    value : str or int or float
+        The filter value; text is converted like an attribute value.
 
     Returns:
     --------
-    tuple or None
-        Returns a tuple of extracted parameters (types, x_attr, y_attr, etc.) or None if parsing fails.
-    """
-    pattern = r"Plot (all|[\w,]+) x=(\w+|default) y=(\w+)(?: from=(\S+) to=(\S+))?(?: __att\[(\w+)\]=(\w+))?(?: p__att\[(\w+)\]=(\w+))?"
-    match = re.match(pattern, command)
-    if match:
-        types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value = match.groups()
-        types = types.split(',') if types != 'all' else 'all'
-        x_attr = None if x_attr == 'default' else x_attr
-        return (types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value)
-    return None
+    numpy.ndarray
+        One bool per entry.
+    """
+    typed = _coerce_value(value) if isinstance(value, str) else value
+    if column.dtype.kind in 'iuf':
+        if not isinstance(typed, (int, float)):
+            return np.zeros(len(column), dtype=bool)
+        try:
+            return column == typed
+        except OverflowError:  # An integer beyond int64 matches no int64 value
+            return np.zeros(len(column), dtype=bool)
+    return column == typed
+
+# Tokens of a where clause: brackets and commas, operators, quoted text, words
+FILTER_TOKEN = re.compile(r"""\s*(?:([(),])|(==|!=|<=|>=|=|<|>)|"([^"]*)"|'([^']*)'|([^\s(),=!<>"']+))""")
+FILTER_OPERATORS = {'=': operator.eq, '==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
 
-# Alternate parser function for handling data commands
-def data_parser(command):
+# Parse the where clause of a command
+def parse_filter(text):
     """
-    Parses data commands and extracts the required parameters for data processing.
+    Parses a filter expression into a tree of tuples evaluated by _filter_mask:
+
+        expression := term ('or' term)*
+        term       := factor ('and' factor)*
+        factor     := 'not' factor | '(' expression ')' | comparison
+        comparison := attribute operator value | attribute ['not'] 'in' '(' value (',' value)* ')'
+
+    The operators are = (or ==), !=, <, <=, > and >=. Keywords are not case
+    sensitive. Values are converted like attribute values unless quoted, and
+    'parent_' attributes are those of the parent entry, as in MYTABLE.column.
+    Entries without an attribute match neither a comparison of it nor its
+    negation, like NULL in SQL: x != v, x not in (v) and not x = v all leave
+    them out (see _filter_mask).
+    Example: NumDecodes>0 and (Slot in (0,1) or CellId!=65534).
 
     Parameters:
     -----------
-    command : str
-        The command string for data processing.
+    text : str
+        The filter expression.
 
     Returns:
     --------
-    tuple or None
-        Returns a tuple of extracted parameters or None if parsing fails.
-    """
-    pattern = r"Plot (all|[\w,]+) x=(\w+|default) y=(\w+)(?: from=(\S+) to=(\S+))?(?: __att\[(\w+)\]=(\w+))?(?: p__att\[(\w+)\]=(\w+))?"
-    match = re.match(pattern, command)
-    if match:
-        types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value = match.groups()
-        types = types.split(',') if types != 'all' else 'all'
-        x_attr = None if x_attr == 'default' else x_attr
-        return (types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value)
-    return None
+    tuple
+        ('or', a, b), ('and', a, b), ('not', a), ('cmp', attribute, operator, value)
+        or ('in', attribute, values).
+
+    Raises:
+    -------
+    ValueError
+        If the expression is not valid.
+    """
+    tokens = []
+    position, text = 0, text.rstrip()
+    while position < len(text):
+        match = FILTER_TOKEN.match(text, position)
+        if not match:
+            raise ValueError(f"Unexpected character in filter at {text[position:]!r}")
+        position = match.end()
+        symbol, comparison, double, single, word = match.groups()
+        if double is not None or single is not None:
+            tokens.append(('value', double if double is not None else single))
+        elif word is not None:
+            tokens.append(('word', word))
+        else:
+            tokens.append(('symbol', symbol or comparison))
+    tokens.append(('end', None))
+    stream = iter(tokens)
+    token = [next(stream)]
+
+    def peek(kind, value=None):
+        current = token[0]
+        return current[0] == kind and (value is None or (current[1].lower() if kind == 'word' else current[1]) == value)
+
+    def take(kind, value=None):
+        if not peek(kind, value):
+            found = 'the end' if token[0][0] == 'end' else repr(token[0][1])
+            raise ValueError(f"Expected {value or kind} in filter, found {found}")
+        current = token[0]
+        token[0] = next(stream, ('end', None))
+        return current[1]
+
+    def value():
+        if peek('value'):
+            return take('value')
+        return _coerce_value(take('word'))
+
+    def expression():
+        left = term()
+        while peek('word', 'or'):
+            take('word')
+            left = ('or', left, term())
+        return left
+
+    def term():
+        left = factor()
+        while peek('word', 'and'):
+            take('word')
+            left = ('and', left, factor())
+        return left
+
+    def factor():
+        if peek('word', 'not'):
+            take('word')
+            return ('not', factor())
+        if peek('symbol', '('):
+            take('symbol')
+            inner = expression()
+            take('symbol', ')')
+            return inner
+        attribute = take('word')
+        negate = peek('word', 'not')
+        if negate:
+            take('word')
+        if negate or peek('word', 'in'):
+            take('word', 'in')
+            take('symbol', '(')
+            values = [value()]
+            while peek('symbol', ','):
+                take('symbol')
+                values.append(value())
+            take('symbol', ')')
+            values = tuple(values)
+            return ('not', ('in', attribute, values)) if negate else ('in', attribute, values)
+        comparison = take('symbol')
+        if comparison not in FILTER_OPERATORS:
+            raise ValueError(f"Expected a comparison in filter, found {comparison!r}")
+        return ('cmp', attribute, comparison, value())
+
+    tree = expression()
+    take('end')
+    return tree
+
+# Attributes used by a parsed filter
+def _filter_keys(tree):
+    if tree[0] in ('and', 'or'):
+        return _filter_keys(tree[1]) + _filter_keys(tree[2])
+    if tree[0] == 'not':
+        return _filter_keys(tree[1])
+    return [tree[1]]
+
+# Mask of the column entries that have a value
+def _present(column):
+    if column.dtype.kind in 'iuf':
+        return np.ones(len(column), dtype=bool)
+    return np.not_equal(column, None)
+
+# Compare a column with a value
+def _compare(column, comparison, value):
+    """
+    Evaluates column <comparison> value for every entry. = and != compare like
+    _matches; entries without the attribute and values of another kind (text
+    against numbers) never match, except that != matches values of another kind.
+    Numeric columns are compared in one vectorized step.
+    """
+    if comparison in ('=', '=='):
+        return _matches(column, value)
+    if comparison == '!=':
+        return _present(column) & ~_matches(column, value)
+    compare = FILTER_OPERATORS[comparison]
+    if column.dtype.kind in 'iuf':
+        if not isinstance(value, (int, float)):
+            return np.zeros(len(column), dtype=bool)
+        try:
+            return compare(column, value)
+        except OverflowError:  # An integer beyond int64
+            return compare(column.astype(np.float64), float(value))
+    try:
+        return np.asarray(compare(column, value), dtype=bool)
+    except TypeError:  # Mixed column: compare entry by entry, mismatched kinds never match
+        mask = np.zeros(len(column), dtype=bool)
+        for row, entry in enumerate(column.tolist()):
+            try:
+                mask[row] = compare(entry, value)
+            except TypeError:
+                pass
+        return mask
+
+# Evaluate a parsed filter over some rows of a table
+def _filter_mask(tree, table, rows):
+    """
+    Returns the mask of the given rows of a table that match a filter parsed by
+    parse_filter, combining one vectorized comparison per attribute. A
+    comparison is unknown for entries without its attribute, and 'not' keeps
+    it unknown (three-valued logic, see _filter_truth), so such entries match
+    x != v, x not in (...) and not x = v alike: never.
+
+    >>> ds = MYDS()
+    >>> ds.parse(["1.0: x\\tA(k: 1)\\n", "2.0: x\\tA(k: 2)\\n", "3.0: x\\tA(j: 5)\\n"])
+    >>> table, rows = ds.lookup['A'], np.arange(3)
+    >>> [_filter_mask(parse_filter(text), table, rows).tolist() for text in ('k != 1', 'k not in (1)', 'not k = 1', 'not k = 1 or j = 5')]
+    [[False, True, False], [False, True, False], [False, True, False], [False, True, True]]
+
+    Parameters:
+    -----------
+    tree : tuple
+        The parsed filter.
+    table : MYTABLE
+        The table the rows belong to.
+    rows : numpy.ndarray
+        The row indices to test.
+
+    Returns:
+    --------
+    numpy.ndarray
+        One bool per row.
+    """
+    return _filter_truth(tree, table, rows)[0]
+
+# Evaluate a parsed filter in three-valued logic
+def _filter_truth(tree, table, rows):
+    """
+    Returns the masks of the rows for which a parsed filter is true and for
+    which it is false; rows in neither lack an attribute it compares.
+    """
+    kind = tree[0]
+    if kind == 'and':
+        (true_a, false_a), (true_b, false_b) = _filter_truth(tree[1], table, rows), _filter_truth(tree[2], table, rows)
+        return true_a & true_b, false_a | false_b
+    if kind == 'or':
+        (true_a, false_a), (true_b, false_b) = _filter_truth(tree[1], table, rows), _filter_truth(tree[2], table, rows)
+        return true_a | true_b, false_a & false_b
+    if kind == 'not':
+        true, false = _filter_truth(tree[1], table, rows)
+        return false, true
+    column = table.column(tree[1])
+    if column is None:
+        none = np.zeros(len(rows), dtype=bool)  # No entry of the table has the attribute
+        return none, none
+    column = column[rows]
+    if kind == 'in':
+        values = tree[2]
+        if column.dtype.kind in 'iuf':
+            numbers = [value for value in values if isinstance(value, (int, float)) and -2 ** 63 <= value < 2 ** 63]
+            mask = np.isin(column, numbers)
+        else:
+            mask = np.zeros(len(rows), dtype=bool)
+            for value in values:
+                mask |= _matches(column, value)
+    else:
+        mask = _compare(column, tree[2], tree[3])
+    return mask, ~mask & _present(column)
+
+# agg= and bucket= options of a command, and the units of bucket durations
+AGGREGATE_OPTION = re.compile(r"\s(agg|bucket)=(\S+)")
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')  # Plus percentiles p0 to p100, e.g. p99 or p99.9
+DURATION = re.compile(r"([0-9.]+(?:[eE][-+]?[0-9]+)?)(ns|us|ms|s|m|min|h)?")
+DURATION_UNITS = {'ns': 1e-9, 'us': 1e-6, 'ms': 1e-3, 's': 1.0, 'm': 60.0, 'min': 60.0, 'h': 3600.0}
+
+# Check the name of an aggregate
+def _check_aggregate(agg):
+    if agg in AGGREGATES:
+        return agg
+    match = re.fullmatch(r"p([0-9]+(?:\.[0-9]+)?)", agg)
+    if not match or float(match.group(1)) > 100:
+        raise ValueError(f"Unknown aggregate {agg!r}, expected one of {', '.join(AGGREGATES)} or a percentile such as p99")
+    return agg
+
+# Convert a bucket duration to seconds
+def parse_duration(text):
+    """
+    Converts a duration such as '10ms', '1.5s', '500us', '2m' or '0.01' (seconds)
+    to seconds.
+
+    Raises:
+    -------
+    ValueError
+        If the text is not a positive duration.
+    """
+    match = DURATION.fullmatch(text)
+    if not match:
+        raise ValueError(f"Invalid duration {text!r}, expected e.g. 10ms or 1s")
+    seconds = float(match.group(1)) * DURATION_UNITS[match.group(2) or 's']
+    if not seconds > 0:
+        raise ValueError(f"Invalid duration {text!r}, it must be positive")
+    return seconds
+
+# Query is a plot/get command compiled for evaluation against the dataset
+class Query:
+    """
+    A compiled plot command (see PLOT_COMMAND). select() looks the
+    requested message types up directly instead of scanning the lookup, finds the
+    time range of each table by binary search, and resolves the attribute filters
+    through the inverted indexes of the tables (see MYTABLE.value_rows), so the
+    cost of a filtered query follows the number of matching entries.
+
+    Attributes:
+    -----------
+    types : list or str
+        The message types, or 'all'.
+    x_attr, y_attr : str
+        The plotted attributes (x_attr None for the timestamps).
+    start_time, end_time : float or None
+        The time range.
+    filters : list
+        (attribute, value) pairs the entries must all match, with the values
+        converted like attribute values.
+    parent_filter_key : str or None
+        The attribute the _START entry enclosing the entries must have ...
+    parent_filter_value : str or int or float
+        ... with this value, converted like an attribute value.
+    where : tuple or None
+        A filter parsed by parse_filter that the entries must match as well.
+    agg : str or None
+        The aggregate computed over the y values of every time bucket (see
+        prepare_aggregate_data), or None to return the entries themselves.
+    bucket : float or str or None
+        The width of the time buckets in seconds, None for a single bucket, or
+        'auto' for a power-of-two width giving about ROLLUP_PIXELS buckets over
+        the time range (see prepare_rollup_data).
+    """
+    def __init__(self, types, x_attr=None, y_attr=None, start_time=None, end_time=None, filter_key=None, filter_value=None, parent_filter_key=None, parent_filter_value=None, filters=None, where=None, agg=None, bucket=None):
+        """
+        Initializes a query. The parameters are the attributes of the same name,
+        except for the attribute filters, which are given either as filter_key and
+        filter_value or as a list of (attribute, value) pairs in filters.
+        """
+        self.where = where
+        self.agg = agg
+        self.bucket = bucket
+        self.types = types
+        self.x_attr = x_attr
+        self.y_attr = y_attr
+        self.start_time = start_time
+        self.end_time = end_time
+        if filters is None:
+            filters = [(filter_key, filter_value)] if filter_key else []
+        self.filters = [(key, _coerce_value(value) if isinstance(value, str) else value) for key, value in filters]
+        self.parent_filter_key = parent_filter_key
+        self.parent_filter_value = _coerce_value(parent_filter_value) if isinstance(parent_filter_value, str) else parent_filter_value
+
+    # Compile a command string
+    @classmethod
+    def compile(cls, command):
+        """
+        Parses a plot command (see PLOT_COMMAND) into a Query. from= and to=
+        are timestamps in seconds; the ':' that ends a timestamp copied from a
+        log line is ignored. Every
+        __att[key]=value of the command becomes a filter, and a trailing
+        'where <expression>' clause is parsed with parse_filter. The options
+        agg=<count|sum|mean|min|max|pNN> and bucket=<duration|auto> (e.g. 10ms)
+        may appear anywhere before the where clause.
+
+        Returns:
+        --------
+        Query or None
+            None if the command is not valid.
+        """
+        options = dict(AGGREGATE_OPTION.findall(command))
+        command = AGGREGATE_OPTION.sub('', command)
+        match = PLOT_COMMAND.match(command)
+        if not match:
+            return None
+        types, x_attr, y_attr, start_time, end_time, _, _, parent_filter_key, parent_filter_value = match.groups()
+        where = WHERE_CLAUSE.search(command)
+        try:
+            start_time = float(start_time.rstrip(':')) if start_time else None
+            end_time = float(end_time.rstrip(':')) if end_time else None
+            where = parse_filter(where.group(1)) if where else None
+            agg = _check_aggregate(options['agg']) if 'agg' in options else None
+            bucket = options.get('bucket')
+            bucket = parse_duration(bucket) if bucket not in (None, 'auto') else bucket
+            if bucket is not None and agg is None:
+                raise ValueError("bucket= needs an aggregate, e.g. agg=mean")
+        except ValueError as e:
+            print(e)
+            return None
+        return cls(types.split(',') if types != 'all' else 'all', None if x_attr == 'default' else x_attr, y_attr, start_time, end_time,
+                   parent_filter_key=parent_filter_key, parent_filter_value=parent_filter_value,
+                   filters=ATTRIBUTE_FILTER.findall(command), where=where, agg=agg, bucket=bucket)
+
+    # The same query over another time range
+    def within(self, start_time, end_time):
+        query = copy.copy(self)
+        query.start_time, query.end_time = start_time, end_time
+        return query
+
+    # Attributes the query reads, for require()
+    def keys(self):
+        keys = [None if self.agg else self.x_attr, None if self.agg == 'count' else self.y_attr, self.parent_filter_key] + [key for key, _ in self.filters]
+        return keys + (_filter_keys(self.where) if self.where else [])
+
+    # Normalized form of the query, e.g. for caching its results
+    def key(self):
+        """
+        Returns a hashable key that is equal for queries selecting the same data,
+        whatever the order of their message types and filters.
+        """
+        return self.selection_key() + (self.x_attr, self.y_attr, self.agg, self.bucket)
+
+    # Normalized form of the entries the query selects
+    def selection_key(self):
+        """
+        Returns a hashable key that is equal for queries selecting the same entries,
+        whatever attributes they read from them (see get_many).
+        """
+        types = self.types if self.types == 'all' else tuple(sorted(set(self.types)))
+        filters = tuple(sorted(set(self.filters), key=repr))
+        return (types, self.start_time, self.end_time, filters, self.parent_filter_key, self.parent_filter_value, self.where)
+
+    # Tables of the requested message types, in dataset order
+    def tables(self, dataset):
+        if self.types == 'all':
+            return list(dataset.lookup.values())
+        names = sorted({name for name in self.types if name in dataset.lookup}, key=dataset._type_ids.get)
+        return [dataset.lookup[name] for name in names]
+
+    # Run the query
+    def select(self, dataset, index=True):
+        """
+        Selects the matching entries of a dataset. The parent filter selects the
+        matching spans of the dataset's SpanTable first, then the entries whose
+        parent is the _START entry of one of them.
+
+        Parameters:
+        -----------
+        dataset : MYDS
+            The dataset to select from.
+        index : bool, optional
+            Whether to resolve the filters through the inverted indexes (default)
+            or by comparing the columns over the time range.
+
+        Returns:
+        --------
+        list
+            A list of (MYTABLE, row indices) pairs, in dataset order.
+        """
+        selection = []
+        parents = None
+        if self.parent_filter_key:
+            spans = dataset.spans
+            parents = spans.start_seqs[spans.select(self.parent_filter_key, self.parent_filter_value)]
+            if not len(parents):
+                return selection
+        for table in self.tables(dataset):
+            first, last = table.time_range(self.start_time, self.end_time)
+            if first == last:
+                continue
+            rows = self._filter(table, first, last, parents) if index else self._scan(table, first, last, parents)
+            if rows is not None and self.where is not None:
+                rows = rows[_filter_mask(self.where, table, rows)]
+            if rows is not None and len(rows):
+                selection.append((table, rows))
+        return selection
+
+    # Rows of a time range matching every filter, from the inverted indexes
+    def _filter(self, table, first, last, parents=None):
+        if not self.filters and parents is None:
+            return np.arange(first, last)
+        matches = []
+        if parents is not None:
+            rows = table.child_rows(parents)
+            matches.append((len(rows), None, None, rows))
+        for key, value in self.filters:
+            rows = table.value_rows(key, value)
+            if rows is None:
+                return None  # No entry of the table has the attribute
+            matches.append((len(rows), key, value, rows))
+        matches.sort(key=lambda match: match[0])
+        rows = matches[0][3]
+        rows = rows[np.searchsorted(rows, first):np.searchsorted(rows, last)]
+        for _, key, value, _ in matches[1:]:
+            if key is None:
+                rows = rows[np.isin(table.parents[rows], parents)]
+            else:
+                rows = rows[_matches(table.column(key)[rows], value)]  # Check the rarest value's rows only
+        return rows
+
+    # Rows of a time range matching every filter, by comparing the columns
+    def _scan(self, table, first, last, parents=None):
+        mask = np.ones(last - first, dtype=bool)
+        if parents is not None:
+            mask &= np.isin(table.parents[first:last], parents)
+        for key, value in self.filters:
+            column = table.column(key)
+            if column is None:
+                return None
+            mask &= _matches(column[first:last], value)
+        return np.flatnonzero(mask) + first
+
+QUERY_CACHE_ENTRIES = 32
+QUERY_CACHE_BYTES = 256 * 1024 * 1024
+
+# Approximate memory used by a cached query result
+def _result_bytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes + (32 * value.size if value.dtype == object else 0)
+    if isinstance(value, NodeInfo):
+        return sum(rows.nbytes for _, rows in value.selection)
+    if isinstance(value, BucketInfo):
+        return value.counts.nbytes + value.first_seqs.nbytes
+    if isinstance(value, (list, tuple)):
+        return 40 * len(value) if isinstance(value, list) else sum(_result_bytes(item) for item in value)
+    return 0
+
+# QueryCache keeps the results of recent queries
+class QueryCache:
+    """
+    Least recently used cache of query results, bounded by the number of entries
+    and by their approximate size in bytes. Keys contain the generation of the
+    dataset (MYDS.generation), so a result is never returned once the entries it
+    was computed from have changed; initialize() clears the cache as well.
+
+    Attributes:
+    -----------
+    max_entries : int
+        The maximum number of results kept.
+    max_bytes : int
+        The maximum approximate size of the results kept; larger results are
+        not cached.
+    size : int
+        The approximate size of the results kept.
+    hits, misses : int
+        Lookup counts.
+    """
+    def __init__(self, max_entries=QUERY_CACHE_ENTRIES, max_bytes=QUERY_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # Key -> (result, size), least recently used first
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Look up a result, computing and storing it if missing
+    def get(self, key, compute):
+        """
+        Returns the cached result for a key, or compute() stored under the key.
+
+        Parameters:
+        -----------
+        key : hashable
+            The cache key.
+        compute : callable
+            Computes the result when it is not cached.
+
+        Returns:
+        --------
+        object
+            The result. Cached results are shared, callers must not modify them.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = compute()
+        size = _result_bytes(value)
+        if self.max_entries > 0 and size <= self.max_bytes:
+            self._entries[key] = (value, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self.size -= dropped
+        return value
+
+    # Drop all cached results
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+# Results of the recent plot/get commands
+query_cache = QueryCache()
 
 # Filter nodes based on command parameters
 def filter_nodes(dataset, types, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value):
     """
-    Filters nodes from the dataset based on the provided parameters such as type, 
-    time range, and attribute filters.
+    Filters entries from the dataset based on the provided parameters such as type,
+    time range, and attribute filters (see Query.select).
 
     Parameters:
     -----------
     dataset : MYDS
-        The dataset to filter nodes from.
+        The dataset to filter entries from.
     types : list or str
         The list of message types to filter (or 'all' for no type filtering).
-    start_time : str
-        The starting time for the filter.
-    end_time : str
-        The ending time for the filter.
+    start_time : float
+        The starting time for the filter, or None.
+    end_time : float
+        The ending time for the filter, or None.
     filter_key : str
         The attribute key to filter by.
     filter_value : str
@@ -285,32 +3332,78 @@ def filter_nodes(dataset, types, start_time, end_time, filter_key, filter_value,
     Returns:
     --------
     list
-        A list of filtered nodes that match the filter criteria.
-    """
-    filtered_nodes = []
-    for log_type, node_list in dataset.lookup.items():
-        if types != 'all' and log_type not in types:
-            continue
-        for timestamp, node in node_list:
-            if start_time and timestamp < start_time or end_time and timestamp > end_time:
-                continue
-            # Apply filters based on attributes
-            if filter_key and str(node.attributes.get(filter_key)) != str(filter_value):
-                continue
-            filtered_nodes.append(node)
-    return filtered_nodes
+        A list of (MYTABLE, row indices) pairs selecting the matching entries.
+    """
+    query = Query(types, None, None, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value)
+    return query.select(dataset)
+
+# Gather one attribute over a selection of rows
+def _gather(selection, key, default='N/B'):
+    """
+    Concatenates the values of an attribute over the rows of a selection.
+
+    Parameters:
+    -----------
+    selection : list
+        (MYTABLE, row indices) pairs as returned by filter_nodes.
+    key : str
+        The attribute name, or None for the timestamps.
+    default : object
+        The value used for rows lacking the attribute, or None to use their
+        timestamps.
+
+    Returns:
+    --------
+    numpy.ndarray
+        One value per selected row.
+    """
+    parts = []
+    for table, rows in selection:
+        column = table.timestamps if key is None else table.column(key)
+        if column is None:
+            column = table.timestamps if default is None else np.full(len(table), default, dtype=object)
+        part = column[rows]
+        if part.dtype == object:
+            missing = np.equal(part, None)  # Rows lacking the attribute
+            if missing.any():
+                part[missing] = table.timestamps[rows[missing]] if default is None else default
+        parts.append(part)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=object)
+
+# NodeInfo gives per-point annotation details without building them up front
+class NodeInfo:
+    """
+    Sequence of annotation dictionaries for plotted points. The dictionary of a point
+    (and its MYNODE) is only built when the point is accessed, e.g. on hover.
+    """
+    def __init__(self, selection, x_data, y_data):
+        self.selection = selection
+        self.x_data = x_data
+        self.y_data = y_data
+        self.offsets = np.cumsum([0] + [len(rows) for _, rows in selection])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __getitem__(self, idx):
+        part = int(np.searchsorted(self.offsets, idx, side='right')) - 1
+        table, rows = self.selection[part]
+        node_seq = table.seqs[rows[idx - self.offsets[part]]]
+        node = table.dataset.node(node_seq)
+        return {'line_number': table.dataset.line_number(node_seq), 'x': _py(self.x_data[idx]), 'y': _py(self.y_data[idx]), 'attributes': node.attributes, 'parent_attributes': node.parent.attributes if node.parent else {}}
 
 # Prepare data for plotting
-def prepare_plot_data(nodes, x_attr, y_attr):
+def prepare_plot_data(selection, x_attr, y_attr):
     """
     Prepares the X and Y data for plotting along with node information.
 
     Parameters:
     -----------
-    nodes : list
-        A list of filtered nodes to be plotted.
+    selection : list
+        (MYTABLE, row indices) pairs as returned by filter_nodes.
     x_attr : str
-        The attribute for the X axis (or None for timestamp).
+        The attribute for the X axis (or None for timestamp). Tables without the
+        attribute fall back to the timestamp.
     y_attr : str
         The attribute for the Y axis.
 
@@ -319,20 +3412,20 @@ def prepare_plot_data(nodes, x_attr, y_attr):
     tuple
         Returns a tuple containing X data, Y data, and node information for annotation.
     """
-    x_data = [getattr(node, x_attr, node.timestamp) for node in nodes] if x_attr else [node.timestamp for node in nodes]
-    y_data = [node.attributes.get(y_attr, 'N/B') for node in nodes]
-    node_info = [{'line_number': idx + 1, 'x': x_data[idx], 'y': y_data[idx], 'attributes': node.attributes, 'parent_attributes': node.parent.attributes if node.parent else {}} for idx, node in enumerate(nodes)]
+    x_data = _gather(selection, x_attr, default=None)
+    y_data = _gather(selection, y_attr)
+    node_info = NodeInfo(selection, x_data, y_data)
     return (x_data, y_data, node_info)
 
 # Prepare y_data for get function
-def prepare_get_data(nodes, x_attr, y_attr):
+def prepare_get_data(selection, x_attr, y_attr):
     """
-    Prepares the Y data for fetching based on filtered nodes and attributes.
+    Prepares the Y data for fetching based on filtered entries and attributes.
 
     Parameters:
     -----------
-    nodes : list
-        A list of filtered nodes to process.
+    selection : list
+        (MYTABLE, row indices) pairs as returned by filter_nodes.
     x_attr : str
         The attribute for the X axis (or None for timestamp).
     y_attr : str
@@ -341,15 +3434,185 @@ def prepare_get_data(nodes, x_attr, y_attr):
     Returns:
     --------
     list
-        A list of Y values extracted from the node attributes.
+        A list of Y values extracted from the entry attributes.
+    """
+    return _gather(selection, y_attr).tolist()
+
+# BucketInfo gives annotation details for the points of an aggregated plot
+class BucketInfo:
+    """
+    Sequence of annotation dictionaries for the buckets of prepare_aggregate_data,
+    in the format of NodeInfo. The line number is that of the first logged entry
+    of the bucket, and the attributes hold the number of entries aggregated.
+    """
+    def __init__(self, dataset, x_data, y_data, counts, first_seqs):
+        self.dataset = dataset
+        self.x_data = x_data
+        self.y_data = y_data
+        self.counts = counts
+        self.first_seqs = first_seqs
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __getitem__(self, idx):
+        return {'line_number': self.dataset.line_number(self.first_seqs[idx]), 'x': _py(self.x_data[idx]), 'y': _py(self.y_data[idx]), 'attributes': {'entries': int(self.counts[idx])}, 'parent_attributes': {}}
+
+# Aggregate the y values of a selection per time bucket
+def prepare_aggregate_data(selection, y_attr, agg, bucket=None):
+    """
+    Groups the selected entries into time buckets and computes one aggregate of
+    their y values per non-empty bucket, with vectorized reductions over the
+    entries sorted by time. Buckets are aligned to multiples of their width, so
+    the same bucket always covers the same time range.
+
+    Parameters:
+    -----------
+    selection : list
+        (MYTABLE, row indices) pairs as returned by filter_nodes.
+    y_attr : str
+        The aggregated attribute. Entries without a numeric value are left out,
+        except for 'count', which counts every entry.
+    agg : str
+        'count', 'sum', 'mean', 'min', 'max' or a percentile such as 'p99'
+        (linear interpolation, like numpy.percentile).
+    bucket : float, optional
+        The bucket width in seconds (default is a single bucket).
+
+    Returns:
+    --------
+    tuple
+        (bucket start times, aggregates, BucketInfo); for a single bucket the
+        start time is that of its first entry.
+    """
+    owner = selection[0][0].dataset if selection else dataset
+    times, values, seqs = [], [], []
+    for table, rows in selection:
+        if agg == 'count':
+            part = np.zeros(len(rows))
+        else:
+            column = table.column(y_attr)
+            if column is None:
+                continue
+            part = _numeric(column[rows])
+        times.append(table.timestamps[rows])
+        values.append(part)
+        seqs.append(table.seqs[rows])
+    if not times:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, BucketInfo(owner, empty, empty, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    times, values, seqs = np.concatenate(times), np.concatenate(values), np.concatenate(seqs)
+    keep = ~(np.isnan(times) | np.isnan(values))
+    times, values, seqs = times[keep], values[keep], seqs[keep]
+    if len(selection) > 1:
+        order = np.argsort(times, kind='stable')  # Each table is sorted by time already
+        times, values, seqs = times[order], values[order], seqs[order]
+    ids = np.floor(times / bucket).astype(np.int64) if bucket else np.zeros(len(times), dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1]))) if len(ids) else np.empty(0, dtype=np.int64)
+    counts = np.diff(np.append(starts, len(ids)))
+    x_data = ids[starts] * bucket if bucket else times[starts]
+    if agg == 'count':
+        y_data = counts.copy()
+    elif not len(starts):
+        y_data = np.empty(0, dtype=np.float64)
+    elif agg == 'sum':
+        y_data = np.add.reduceat(values, starts)
+    elif agg == 'mean':
+        y_data = np.add.reduceat(values, starts) / counts
+    elif agg == 'min':
+        y_data = np.minimum.reduceat(values, starts)
+    elif agg == 'max':
+        y_data = np.maximum.reduceat(values, starts)
+    else:
+        ordered = values[np.lexsort((values, ids))]  # Sorted within every bucket
+        position = starts + float(agg[1:]) / 100 * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, starts + counts - 1)
+        y_data = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+    return x_data, y_data, BucketInfo(owner, x_data, y_data, counts, np.minimum.reduceat(seqs, starts) if len(starts) else seqs[starts])
+
+# Aggregate a query over a window from the rollups
+def prepare_rollup_data(query, dataset, pixels=ROLLUP_PIXELS):
+    """
+    Computes an aggregated query with bucket='auto' (see Query). The bucket width
+    is the power of two giving at most about `pixels` buckets over the time range
+    of the query (the whole dataset by default), and the range is widened to
+    whole buckets. count, sum, mean, min and max of unfiltered queries are read
+    from the rollup pyramids of the tables (MYTABLE.rollup), so the cost follows
+    the number of buckets instead of the number of entries; other queries are
+    aggregated from the entries with the same buckets and give the same result.
+
+    Parameters:
+    -----------
+    query : Query
+        The query, with agg set.
+    dataset : MYDS
+        The dataset to query.
+    pixels : int, optional
+        The number of buckets aimed for (default is ROLLUP_PIXELS).
+
+    Returns:
+    --------
+    tuple
+        (bucket start times, aggregates, BucketInfo) as from prepare_aggregate_data.
+    """
+    start = dataset.MIN if query.start_time is None else query.start_time
+    end = dataset.MAX if query.end_time is None else query.end_time
+    width = _bucket_width((end - start) / max(pixels, 1), max(abs(start), abs(end)))
+    first, last = int(np.floor(start / width)), int(np.floor(end / width))
+    window = query.within(first * width, np.nextafter((last + 1) * width, -np.inf))
+    if query.agg not in AGGREGATES or window.filters or window.where is not None or window.parent_filter_key:
+        return prepare_aggregate_data(window.select(dataset), query.y_attr, query.agg, width)
+    key = None if query.agg == 'count' else query.y_attr
+    parts = []
+    for table in window.tables(dataset):
+        rollup = table.rollup(key)
+        if rollup is None:
+            continue  # No entry of the table has the attribute
+        buckets = rollup.fetch(width, first, last)
+        if buckets is None:  # Finer than the rollup, summarize the entries of the window
+            low, high = table.time_range(window.start_time, window.end_time)
+            values = np.zeros(high - low) if key is None else _numeric(table.column(key)[low:high])
+            buckets = _bucket_stats(table.timestamps[low:high], values, table.seqs[low:high], width)
+        parts.append(buckets)
+    if not parts:
+        return prepare_aggregate_data([], query.y_attr, query.agg, width)
+    ids, counts, sums, mins, maxs, firsts = _merge_stats(parts)
+    y_data = {'count': counts, 'sum': sums, 'min': mins, 'max': maxs}.get(query.agg)
+    if y_data is None:
+        y_data = sums / counts
+    x_data = ids * width
+    return x_data, y_data, BucketInfo(dataset, x_data, y_data, counts, firsts)
+
+# Plots that are redrawn when update() adds entries to the dataset
+_live_plots = []
+
+# Convert and thin out the points of a plot
+def _plot_points(x_data, y_data, node_info, max_points):
+    """
+    Converts y values to integers where possible and keeps at most max_points
+    evenly spaced points (with their node information).
+
+    Returns:
+    --------
+    tuple
+        (x_data, y_data, node_info) ready for plotting.
     """
-    x_data = [getattr(node, x_attr, node.timestamp) for node in nodes] if x_attr else [node.timestamp for node in nodes]
-    y_data = [node.attributes.get(y_attr, 'N/B') for node in nodes]
-    node_info = [{'line_number': idx + 1, 'x': x_data[idx], 'y': y_data[idx], 'attributes': node.attributes, 'parent_attributes': node.parent.attributes if node.parent else {}} for idx, node in enumerate(nodes)]
-    return y_data
+    y_data = np.asarray(y_data)
+    if y_data.dtype == object:
+        try:
+            y_data = y_data.astype(np.int64)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    if len(x_data) > max_points:
+        indices = np.linspace(0, len(x_data) - 1, max_points).astype(int)
+        x_data = np.asarray(x_data)[indices]
+        y_data = y_data[indices]
+        node_info = [node_info[i] for i in indices]
+    return x_data, y_data, node_info
 
 # Plot data using matplotlib
-def plot_data(x_data, y_data, node_info, x_attr=None, y_attr=None, max_points=10000):
+def plot_data(x_data, y_data, node_info, x_attr=None, y_attr=None, max_points=10000, refresh=None, zoom=None):
     """
     Plots the data using matplotlib, with optional interaction using mplcursors for annotation.
 
@@ -367,36 +3630,67 @@ def plot_data(x_data, y_data, node_info, x_attr=None, y_attr=None, max_points=10
         The attribute for the Y axis.
     max_points : int, optional
         Maximum number of points to display (default is 10,000).
+    refresh : callable, optional
+        Returns fresh (x_data, y_data, node_info). If given, the plot is redrawn
+        with its result whenever update() adds entries, until the figure is closed.
+    zoom : callable, optional
+        Called as zoom(start, end, pixels) with the visible x range and the width
+        of the axes in pixels after the user zooms or pans; returns fresh
+        (x_data, y_data, node_info) for that range.
     """
-    try:
-        y_data = [int(i) for i in y_data]
-    except:
-        pass
-    if len(x_data) > max_points:
-        indices = np.linspace(0, len(x_data) - 1, max_points).astype(int)
-        x_data = np.array(x_data)[indices]
-        y_data = np.array(y_data)[indices]
-        node_info = [node_info[i] for i in indices]
+    figure = plt.figure(figsize=(15, 10))
+    axes = figure.gca()
+    axes.set_title(f"Plot of {y_attr} vs {x_attr or 'Timestamp'}", fontsize=14)
+    axes.set_xlabel(x_attr or "Timestamp", fontsize=12)
+    axes.set_ylabel(y_attr, fontsize=12)
+    drawn = {}
 
-    plt.figure(figsize=(15, 10))
+    def draw(x_data, y_data, node_info):
+        x_data, y_data, node_info = _plot_points(x_data, y_data, node_info, max_points)
+        if drawn:
+            drawn['cursor'].remove()
+            drawn['scatter'].remove()
+        scatter = axes.scatter(x_data, y_data, s=20)
 
-    scatter = plt.scatter(x_data, y_data, s=20)
-    plt.title(f"Plot of {y_attr} vs {x_attr or 'Timestamp'}", fontsize=14)
-    plt.xlabel(x_attr or "Timestamp", fontsize=12)
-    plt.ylabel(y_attr, fontsize=12)
+        # Cursor for showing node information on hover
+        cursor = mplcursors.cursor(scatter, hover=True)
 
-    # Cursor for showing node information on hover
-    cursor = mplcursors.cursor(scatter, hover=True)
+        @cursor.connect("add")
+        def on_add(sel):
+            """
+            Display node information when hovering over data points.
+            """
+            idx = sel.index
+            info = node_info[idx]
+            parent_attr_text = f'Parent Attributes: {info["parent_attributes"]}' if info["parent_attributes"] else "No Parent"
+            sel.annotation.set(text=f'Line: {info["line_number"]}\nX: {info["x"]}\nY: {info["y"]}\nAttributes: {info["attributes"]}\n{parent_attr_text}', fontsize=9, bbox=dict(facecolor='white', alpha=0.8))
 
-    @cursor.connect("add")
-    def on_add(sel):
-        """
-        Display node information when hovering over data points.
-        """
-        idx = sel.index
-        info = node_info[idx]
-        parent_attr_text = f'Parent Attributes: {info["parent_attributes"]}' if info["parent_attributes"] else "No Parent"
-        sel.annotation.set(text=f'Line: {info["line_number"]}\nX: {info["x"]}\nY: {info["y"]}\nAttributes: {info["attributes"]}\n{parent_attr_text}', fontsize=9, bbox=dict(facecolor='white', alpha=0.8))
+        drawn.update(scatter=scatter, cursor=cursor)
+
+    draw(x_data, y_data, node_info)
+    if refresh is not None:
+        def redraw():
+            draw(*refresh())
+            axes.relim()
+            axes.autoscale_view()
+            figure.canvas.draw_idle()
+
+        _live_plots.append(redraw)
+        figure.canvas.mpl_connect('close_event', lambda event: _live_plots.remove(redraw))
+    if zoom is not None:
+        def rezoom(axes):
+            if drawn.get('zooming'):
+                return
+            drawn['zooming'] = True
+            try:
+                start, end = axes.get_xlim()
+                axes.set_autoscale_on(False)  # Keep the limits the user chose
+                draw(*zoom(start, end, max(int(axes.bbox.width), 1)))
+                figure.canvas.draw_idle()
+            finally:
+                drawn['zooming'] = False
+
+        axes.callbacks.connect('xlim_changed', rezoom)
 
     plt.show()
 
@@ -404,24 +3698,35 @@ def plot_data(x_data, y_data, node_info, x_attr=None, y_attr=None, max_points=10
 def main(command,script=None):
     """
     Main function to execute a plot command. Parses the command, filters the dataset, and plots the data.
+    The plot follows entries added later by update().
 
     Parameters:
     -----------
     command : str
         The plot command string to be executed.
     """
-    parsed = parse_command(command)
-    if not parsed:
+    query = Query.compile(command)
+    if not query:
         print("Invalid command format.")
         return
-    types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value = parsed
+    require(query.types, query.keys())
 
-    # Filter and plot data
-    nodes = filter_nodes(dataset, types, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value)
-    x_data, y_data, node_info = prepare_plot_data(nodes, x_attr, y_attr)
-    if(script!=None):
-        x_data,y_data=runScript(x_data,y_data,script)
-    plot_data(x_data, y_data, node_info, x_attr, y_attr)
+    # Filter and plot data, reusing the result of an identical earlier command
+    def select(query=query, pixels=ROLLUP_PIXELS):
+        if query.bucket == 'auto':
+            compute = lambda: prepare_rollup_data(query, dataset, pixels)
+        elif query.agg:
+            compute = lambda: prepare_aggregate_data(query.select(dataset), query.y_attr, query.agg, query.bucket)
+        else:
+            compute = lambda: prepare_plot_data(query.select(dataset), query.x_attr, query.y_attr)
+        x_data, y_data, node_info = query_cache.get(('plot', query.key(), pixels, dataset.generation), compute)
+        if(script!=None):
+            x_data,y_data=runScript(x_data.tolist(),y_data.tolist(),script)
+        return x_data, y_data, node_info
+
+    y_label = f"{query.agg}({query.y_attr})" if query.agg else query.y_attr
+    zoom = (lambda start, end, pixels: select(query.within(start, end), pixels)) if query.bucket == 'auto' else None
+    plot_data(*select(), None if query.agg else query.x_attr, y_label, refresh=select, zoom=zoom)
 
 # Function to get data based on command
 def get(command):
@@ -436,37 +3741,233 @@ def get(command):
     Returns:
     --------
     list
-        A list of Y data values from the filtered nodes.
+        A list of Y data values from the filtered nodes, or of the aggregates of
+        the time buckets for commands with agg= (see prepare_aggregate_data).
     """
-    parsed = data_parser(command)
-    if not parsed:
+    query = Query.compile(command)
+    if not query:
         print("Invalid command format.")
         return
-    types, x_attr, y_attr, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value = parsed
-    nodes = filter_nodes(dataset, types, start_time, end_time, filter_key, filter_value, parent_filter_key, parent_filter_value)
-    y_data = prepare_get_data(nodes, x_attr, y_attr)
-    return y_data
+    require(query.types, query.keys())
+    return _get_data(query, {})
+
+# Fetch the data of several commands at once
+def get_many(commands):
+    """
+    Retrieves the Y data of several commands, e.g. the columns of a table. The
+    commands are compiled and the data they need is loaded first; commands that
+    select the same entries (same types, time range and filters, whatever their
+    y attribute) then share one selection, and every attribute column is
+    gathered from it directly. Results are cached like those of get().
+
+    Parameters:
+    -----------
+    commands : list
+        The command strings (see get).
+
+    Returns:
+    --------
+    list
+        One list of Y data per command, or None for an invalid command.
+    """
+    queries = [Query.compile(command) for command in commands]
+    for command, query in zip(commands, queries):
+        if query is None:
+            print(f"Invalid command format: {command}")
+        else:
+            require(query.types, query.keys())
+    selections = {}
+    return [None if query is None else _get_data(query, selections) for query in queries]
+
+# Get the Y data of a compiled query
+def _get_data(query, selections):
+    """
+    Returns a copy of the (cached) Y data of a query. selections maps
+    Query.selection_key() to the selections already made for other queries
+    of the same batch.
+    """
+    def select():
+        key = query.selection_key()
+        if key not in selections:
+            selections[key] = query.select(dataset)
+        return selections[key]
+
+    if query.bucket == 'auto':
+        compute = lambda: prepare_rollup_data(query, dataset)[1].tolist()
+    elif query.agg:
+        compute = lambda: prepare_aggregate_data(select(), query.y_attr, query.agg, query.bucket)[1].tolist()
+    else:
+        compute = lambda: prepare_get_data(select(), query.x_attr, query.y_attr)
+    y_data = query_cache.get(('get', query.key(), dataset.generation), compute)
+    return list(y_data)  # A copy, callers may modify it
 
 # Initialize dataset by reading a log file
 dataset = MYDS()
 
+# Arguments of the last initialize, used by require() to load the whole log
+_source = None
+
+# Files at least this large are parsed with a process pool by default
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
 # Function to initialize dataset from a file
-def initialize(path):
+def initialize(path, engine="mmap", workers=None, cache=True, lazy=True, keep_types=None, keep_attributes=None, progress=None, cancel=None, log_format=None, rollups=False):
+    """
+    Initializes the dataset by parsing the specified log file. gzip, xz and zstd
+    compressed logs are decompressed on the fly (see open_log). When an up-to-date
+    index sidecar (path + INDEX_SUFFIX) exists it is loaded instead of parsing;
+    otherwise the log is parsed and the sidecar is (re)written for the next run.
+    Several files (e.g. a rotated log) are parsed in parallel and merged into one
+    dataset ordered by timestamp with MYDS.parse_files.
+    The log is parsed into a new MYDS that replaces the module dataset only once
+    it is complete, so a load that fails or is cancelled keeps the previous one.
+
+    Parameters:
+    -----------
+    path : str or list
+        The file path of the log file to read and parse, a glob pattern such as
+        'trace.*', or a list of paths and patterns.
+    engine : str, optional
+        "mmap" (default) scans the memory-mapped file as bytes via MYDS.parse_mmap,
+        switching to MYDS.parse_parallel for files of PARALLEL_MIN_BYTES or more
+        when more than one worker is available.
+        "parallel" always uses MYDS.parse_parallel.
+        "lines" streams decoded text lines through MYDS.parse, so the log is never
+        held in memory as a list of lines.
+        Compressed logs are always read through MYDS.parse_stream.
+    workers : int, optional
+        Number of worker processes for parallel parsing (default is the CPU count).
+        Passing 1 keeps the "mmap" engine serial.
+    cache : bool, optional
+        Whether to use and maintain the index sidecar of a single log file
+        (default is True).
+    lazy : bool, optional
+        Whether to keep attribute strings raw and decode the columns of a message
+        type only when it is first queried (default is True). Queries return the
+        same data either way; a lazy load mostly costs the line splitting.
+    keep_types : iterable, optional
+        Only store entries of these message types (and of _START/_END types, which hold
+        the hierarchy); see MYDS.project. A query that needs more makes get/main
+        load the whole log again (see require).
+    keep_attributes : iterable, optional
+        Only store these attributes. A projected load does not write the index
+        sidecar, but an existing one is used.
+    progress : callable, optional
+        Called as progress(done, total) with the bytes parsed so far and the size
+        of the log on disk, at most every PROGRESS_INTERVAL seconds.
+    cancel : object, optional
+        A cancel token such as threading.Event. Setting it stops the load, which
+        then raises ParseCancelled.
+    log_format : str, optional
+        The name of a registered log format (see register_format). By default
+        the format is detected from the first lines of the (first) file with
+        detect_format.
+    rollups : bool, optional
+        Whether to build the rollups of all numeric attributes right away (see
+        MYDS.build_rollups) and store them in the sidecar (default is False;
+        rollups are otherwise built when a query first needs them).
+
+    Returns:
+    --------
+    bool
+        True if the dataset was replaced, False if the load failed.
+
+    Raises:
+    -------
+    ParseCancelled
+        If the load was cancelled through the cancel token.
+    """
+    global dataset, _source
+    projected = keep_types is not None or keep_attributes is not None
+    save = False  # Whether the sidecar has to be (re)written
+    try:
+        paths = _expand_paths(path)
+        if not paths:
+            raise FileNotFoundError(f"No log file matches {path}")
+        loaded = MYDS(lazy, keep_types, keep_attributes, progress, cancel, log_format or detect_format(paths[0]))
+        if len(paths) > 1:
+            loaded.parse_files(paths, workers)
+        else:
+            log_path = paths[0]
+            index_path = log_path + INDEX_SUFFIX
+            fingerprint = _fingerprint(log_path) if cache else None
+            if cache and loaded.load_index(index_path, fingerprint):
+                loaded.project()  # The index holds the whole log
+                loaded.sources = [[log_path, 0, 0]]
+            else:
+                if detect_compression(log_path) is not None:
+                    with open_log(log_path) as stream:
+                        loaded.parse_stream(stream, path=log_path)
+                elif engine == "parallel" or (engine == "mmap" and (workers or os.cpu_count() or 1) > 1 and os.path.getsize(log_path) >= PARALLEL_MIN_BYTES):
+                    loaded.parse_parallel(log_path, workers)
+                elif engine == "mmap":
+                    loaded.parse_mmap(log_path)
+                else:
+                    with open(log_path, "r", newline='') as file:
+                        loaded.parse(file, log_path)
+                save = cache and not projected
+        if rollups and loaded.build_rollups() and cache and not projected and len(paths) == 1:
+            save = True  # Store the new rollups in the sidecar
+    except ParseCancelled:
+        raise
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+    if save:
+        try:
+            loaded.save_index(index_path, fingerprint)
+        except OSError as e:
+            print(f"Could not write index {index_path}: {e}")
+    loaded.progress = loaded.cancel = None  # Later updates of the dataset are not reported
+    dataset = loaded
+    query_cache.clear()  # Results of the previous dataset are never used again
+    _source = {'path': path, 'engine': engine, 'workers': workers, 'cache': cache, 'lazy': lazy, 'log_format': loaded.log_format, 'rollups': rollups}
+    return True
+
+# Load the whole log if a query needs data left out by a projection
+def require(types, keys=()):
+    """
+    Makes sure the dataset holds the given message types and attributes. If the
+    last initialize left some of them out (keep_types/keep_attributes), the log
+    is initialized again without a projection.
+
+    Parameters:
+    -----------
+    types : list or str
+        The message types the query reads, or 'all'.
+    keys : iterable, optional
+        The attributes the query reads, or None for all of them.
+    """
+    if _source is not None and not dataset.covers(types, keys):
+        print("The query needs data that was not loaded, loading the whole log.")
+        initialize(**_source)
+
+# Function to follow a log file that is still being written
+def update(path):
     """
-    Initializes the dataset by reading log lines from the specified file.
+    Parses the lines appended to the log file since initialize or the previous
+    update and redraws the open plots. A log that became shorter (truncated or
+    rotated) is initialized again.
 
     Parameters:
     -----------
     path : str
-        The file path of the log file to read and parse.
+        The file path of the log file passed to initialize.
+
+    Returns:
+    --------
+    int
+        The number of new entries.
     """
-    dataset.lookup = {}  # Dictionary for storing nodes based on message type
-    dataset.MIN = 0  # Minimum timestamp
-    dataset.MAX = 0  # Maximum timestamp
-    dataset.times=None
     try:
-        with open(path, "r") as file:
-            lines = file.readlines()
-        dataset.parse(lines)
+        added = dataset.update(path)
+        if added is None:
+            initialize(path)
+            added = dataset.count
     except Exception as e:
         print(f"An error occurred: {e}")
+        return 0
+    if added:
+        for redraw in list(_live_plots):
+            redraw()
+    return added
@@ -31,8 +31,7 @@ class MYDS:
         return attr_dict
 
 def initialize(path):
-    with open(path, "r") as file:
-        lines = file.readlines()
     ds = MYDS()
-    ds.parse(lines)
+    with open(path, "r") as file:
+        ds.parse(file)
     return ds
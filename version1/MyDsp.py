@@ -26,8 +26,7 @@ class MYDS:
         return attributes
 
 def initialize(path):
-    with open(path, "r") as file:
-        lines = file.readlines()
     ds = MYDS()
-    ds.parse(lines)
+    with open(path, "r") as file:
+        ds.parse(file)
     return ds
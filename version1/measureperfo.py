@@ -1,11 +1,26 @@
 import os
+import sys
 import time
 import psutil
 import tracemalloc
-from MyDs import initialize as initialize_standard
+from concurrent.futures import ProcessPoolExecutor
+import MyDs
 from MyDsJ import initialize as initialize_json
 from MyDsp import initialize as initialize_pandas
 
+def initialize_standard(path):
+    # Parse the log itself: the defaults would load the .lpidx sidecar on every run after the first
+    return MyDs.initialize(path, engine="mmap", cache=False)
+
+def peak_rss():
+    # Peak resident set size of this process so far, in bytes
+    info = psutil.Process(os.getpid()).memory_info()
+    if hasattr(info, 'peak_wset'):  # Windows reports the high-water mark directly
+        return info.peak_wset
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
 def profile_function(func, file_path):
     # Start profiling
     start_time = time.time()
@@ -14,8 +29,7 @@ def profile_function(func, file_path):
 
     # Execute the function
     try:
-        func(file_path)
-        success = True
+        success = func(file_path) is not False  # MyDs.initialize reports errors by returning False
     except Exception as e:
         print(f"Error during function execution: {e}")
         success = False
@@ -24,7 +38,9 @@ def profile_function(func, file_path):
     final_memory = psutil.Process(os.getpid()).memory_info().rss
     elapsed_time = time.time() - start_time
     memory_usage = (final_memory - initial_memory) / (1024 * 1024)  # in MB
+    peak_heap = tracemalloc.get_traced_memory()[1] / (1024 * 1024)  # in MB, peak Python allocations during the call
     tracemalloc.stop()
+    peak_memory = peak_rss() / (1024 * 1024)  # in MB, high-water mark of the profiling process
 
     # File size
     try:
@@ -38,9 +54,16 @@ def profile_function(func, file_path):
         'file_size': file_size,
         'elapsed_time': elapsed_time,
         'memory_usage': memory_usage,
+        'peak_heap': peak_heap,
+        'peak_rss': peak_memory,
         'success': success
     }
 
+def profile_in_subprocess(func, file_path):
+    # Run each profile in a fresh process, so the peak RSS of one variant is not carried over to the next
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(profile_function, func, file_path).result()
+
 def profile_all_variants_across_files(file_paths):
     results = {}
     for file_path in file_paths:
@@ -49,30 +72,31 @@ def profile_all_variants_across_files(file_paths):
 
         # Profile with MyDs.py
         print(f"\nProfiling standard MYDS (MyDs.py) with file: {file_path}")
-        results[file_key]['MyDs'] = profile_function(initialize_standard, file_path)
+        results[file_key]['MyDs'] = profile_in_subprocess(initialize_standard, file_path)
 
         # Profile with MyDsJ.py
         print(f"\nProfiling JSON MYDS (MydsJ.py) with file: {file_path}")
-        results[file_key]['MydsJ'] = profile_function(initialize_json, file_path)
+        results[file_key]['MydsJ'] = profile_in_subprocess(initialize_json, file_path)
 
         # Profile with MyDsp.py
         print(f"\nProfiling Pandas MYDS (MyDsp.py) with file: {file_path}")
-        results[file_key]['MyDsp'] = profile_function(initialize_pandas, file_path)
+        results[file_key]['MyDsp'] = profile_in_subprocess(initialize_pandas, file_path)
 
     return results
 
-# Files to profile
-file_paths = [
-    r"C:\Users\suhas\Documents\LogPilot\test.txt",
-    r"C:\Users\suhas\Downloads\5G_PDSCH_sample_logs.txt",
-    r"C:\Users\suhas\Downloads\blerone_1.txt"
-]
-
-# Get the profiling results
-profiling_results = profile_all_variants_across_files(file_paths)
-
-# Print out the profiling results
-for file_name, variants in profiling_results.items():
-    print(f"\nResults for {file_name}:")
-    for variant, stats in variants.items():
-        print(f"{variant} - File Size: {stats['file_size']:.3f} MB, Execution Time: {stats['elapsed_time']:.3f} s, Memory Usage: {stats['memory_usage']:.3f} MB, Success: {'Yes' if stats['success'] else 'No'}")
+if __name__ == "__main__":  # The profiling subprocesses import this module
+    # Files to profile
+    file_paths = [
+        r"C:\Users\suhas\Documents\LogPilot\test.txt",
+        r"C:\Users\suhas\Downloads\5G_PDSCH_sample_logs.txt",
+        r"C:\Users\suhas\Downloads\blerone_1.txt"
+    ]
+
+    # Get the profiling results
+    profiling_results = profile_all_variants_across_files(file_paths)
+
+    # Print out the profiling results
+    for file_name, variants in profiling_results.items():
+        print(f"\nResults for {file_name}:")
+        for variant, stats in variants.items():
+            print(f"{variant} - File Size: {stats['file_size']:.3f} MB, Execution Time: {stats['elapsed_time']:.3f} s, Memory Usage: {stats['memory_usage']:.3f} MB, Peak Heap: {stats['peak_heap']:.3f} MB, Peak RSS: {stats['peak_rss']:.3f} MB, Success: {'Yes' if stats['success'] else 'No'}")
@@ -119,7 +119,7 @@ def filter_nodes(dataset, types, start_time, end_time, filter_key, filter_value,
             if filter_key and str(node.attributes.get(filter_key)) != str(filter_value):
                 continue
             # Checking parent attribute directly in the filter condition
-            if parent_filter_key and str(node.parent.attributes.get(parent_filter_key)) != str(parent_filter_value):
+            if parent_filter_key and (node.parent is None or str(node.parent.attributes.get(parent_filter_key)) != str(parent_filter_value)):
                 continue
             # All conditions passed, add node to filtered list
             filtered_nodes.append(node)
@@ -194,7 +194,6 @@ dataset = MYDS()
 def initialize(path):
     try:
         with open(path, "r") as file:
-            lines = file.readlines()
-        dataset.parse(lines)
+            dataset.parse(file)
     except Exception as e:
         print(f"An error occurred: {e}")